@@ -1,18 +1,48 @@
+from collections.abc import Sequence
+
+import numpy as np
+from numpy.typing import ArrayLike
+
 from app.backtest.metrics import (
     calc_total_return,
     calc_annual_return,
     calc_max_drawdown,
     calc_sharpe_ratio,
+    calc_annual_turnover,
 )
-from app.backtest.models import BacktestMetrics, DailySnapshot
-
-
-def analyze_backtest(snapshots: list[DailySnapshot]) -> BacktestMetrics:
-    equity_curve = [snapshot.equity for snapshot in snapshots]
-    total_return = calc_total_return(equity_curve)
-    return BacktestMetrics(
-        total_return=total_return,
-        annual_return=calc_annual_return(total_return, len(snapshots)),
-        max_drawdown=calc_max_drawdown(equity_curve),
-        sharpe_ratio=calc_sharpe_ratio(equity_curve),
-    )
+from app.backtest.models import BacktestMetrics, DailySnapshot, Trade
+
+
+def analyze_backtest(snapshots: Sequence[DailySnapshot], trades: list[Trade] | None = None) -> BacktestMetrics:
+    equity_curve = np.array([snapshot.equity for snapshot in snapshots], dtype=float)
+    trade_values = [trade.shares * trade.price for trade in trades or [] if trade.price is not None]
+    return analyze_equity(equity_curve, trade_values)
+
+
+def analyze_equity(equity_curve: ArrayLike, trade_values: ArrayLike = ()) -> BacktestMetrics:
+    """Metrics of a single equity curve given as an array."""
+    return analyze_equity_curves(np.asarray(equity_curve, dtype=float)[None, :], [trade_values])[0]
+
+
+def analyze_equity_curves(
+        equity_curves: np.ndarray,
+        trade_values: Sequence[ArrayLike] | None = None,
+) -> list[BacktestMetrics]:
+    """Metrics of many equity curves (curves x days) computed together."""
+    trading_days = equity_curves.shape[-1]
+    total_return = calc_total_return(equity_curves)
+    annual_return = calc_annual_return(total_return, trading_days)
+    max_drawdown = calc_max_drawdown(equity_curves)
+    sharpe_ratio = calc_sharpe_ratio(equity_curves)
+    if trade_values is None:
+        trade_values = [()] * len(equity_curves)
+    return [
+        BacktestMetrics(
+            total_return=float(total_return[k]),
+            annual_return=float(annual_return[k]),
+            max_drawdown=float(max_drawdown[k]),
+            sharpe_ratio=float(sharpe_ratio[k]),
+            turnover=calc_annual_turnover(trade_values[k], equity_curves[k]),
+        )
+        for k in range(len(equity_curves))
+    ]
@@ -1,9 +1,23 @@
+from collections.abc import Callable, Iterable, Sequence
 from datetime import date
 
-from app.backtest.models import DailySnapshot
+import numpy as np
+
+from app.backtest.analyzer import analyze_backtest, analyze_equity
+from app.backtest.models import BacktestMetrics, DailySnapshot, RebalancePolicy, StrategyConfig, Trade
 from app.backtest.portfolio import Portfolio
+from app.backtest.signal_cache import SignalCache
+from app.backtest.signal_matrix import SignalMatrix, build_signal_matrix, concat_signal_matrices
+from app.backtest.simulator import (
+    SimulationResult,
+    build_price_matrix,
+    equal_weights,
+    rebalance_mask,
+    simulate_portfolio,
+)
 from app.core.analyzer import analyze_stock
 from app.core.models import Stock
+from app.core.profiling import count, phase, traced
 
 
 class BacktestEngine:
@@ -13,35 +27,126 @@ class BacktestEngine:
             start_date: date,
             end_date: date,
             verbose: bool = False,
+            precompute_signals: bool = True,
+            workers: int = 1,
+            config: StrategyConfig = StrategyConfig(),
+            vectorized_portfolio: bool = True,
+            policy: RebalancePolicy = RebalancePolicy(),
+            signal_cache: SignalCache | None = None,
     ):
+        # The per-day reference path goes through analyze_stock, which only knows the default strategy
+        assert precompute_signals or config == StrategyConfig()
+
         self.stocks = stocks
         self.start_date = start_date
         self.end_date = end_date
         self.verbose = verbose
-        self.strategy_portfolio = Portfolio()
+        self.precompute_signals = precompute_signals
+        self.workers = workers
+        self.config = config
+        self.vectorized_portfolio = vectorized_portfolio
+        self.policy = policy
+        self.signal_cache = signal_cache
+        self.signal_matrix: SignalMatrix | None = None
+        self.strategy_result: SimulationResult | None = None
+        self.benchmark_result: SimulationResult | None = None
+        self.strategy_portfolio = Portfolio(policy)
         self.benchmark_portfolio = Portfolio()
+        # Set by `from_shards`, which computes signals and prices without keeping the stocks
+        self.trading_days: list[date] | None = None
+        self.tickers: list[str] | None = None
+        self.prices: np.ndarray | None = None
+
+    @classmethod
+    def from_shards(
+            cls,
+            load_shards: Callable[[], Iterable[list[Stock]]],
+            start_date: date,
+            end_date: date,
+            verbose: bool = False,
+            workers: int = 1,
+            config: StrategyConfig = StrategyConfig(),
+            policy: RebalancePolicy = RebalancePolicy(),
+            signal_cache: SignalCache | None = None,
+    ) -> "BacktestEngine":
+        """
+        Engine over a universe too large to hold every history in memory at once.
+
+        `load_shards` yields the universe's stocks one shard at a time and is called twice:
+        first for the trading days, then for each shard's signals and prices, after which
+        the shard's histories are released. Only the vectorized portfolio path is available.
+        With a `signal_cache`, only the signal cells it does not hold yet are computed.
+        """
+        with phase("backtest.trading_days"):
+            days = np.empty(0, dtype="datetime64[D]")
+            for shard in load_shards():
+                days = np.union1d(days, _trading_dates(shard, start_date, end_date))
+            trading_days = days.astype(object).tolist()
 
-    def run(self) -> tuple[list[DailySnapshot], list[DailySnapshot]]:
+        build = build_signal_matrix if signal_cache is None else signal_cache.build_signal_matrix
+        matrices: list[SignalMatrix] = []
+        prices: list[np.ndarray] = []
+        for i, shard in enumerate(load_shards()):
+            if verbose:
+                print(f"  Precomputing signals for shard {i + 1} ({len(shard)} stocks, {workers} workers)...")
+            with phase("backtest.signals"):
+                matrices.append(build(shard, trading_days, workers=workers, config=config))
+            with phase("backtest.prices"):
+                prices.append(build_price_matrix(shard, trading_days))
+
+        engine = cls(
+            [], start_date, end_date,
+            verbose=verbose, workers=workers, config=config, policy=policy, signal_cache=signal_cache,
+        )
+        engine.trading_days = trading_days
+        if matrices:
+            engine.signal_matrix = concat_signal_matrices(matrices)
+            engine.tickers = engine.signal_matrix.tickers
+            engine.prices = np.hstack(prices)
+        else:
+            engine.tickers = []
+            engine.prices = np.empty((len(trading_days), 0))
+        return engine
+
+    def run(self) -> tuple[Sequence[DailySnapshot], Sequence[DailySnapshot]]:
         """Run backtest and return (strategy_snapshots, benchmark_snapshots)."""
+        if self.prices is not None:
+            assert self.trading_days is not None
+            with phase("backtest.simulate"):
+                return self._run_vectorized(self.trading_days)
+
         trading_days = self._get_trading_days()
         all_tickers = {stock.info.ticker for stock in self.stocks}
 
+        if self.precompute_signals:
+            if self.verbose:
+                print(f"  Precomputing signals for {len(self.stocks)} stocks ({self.workers} workers)...")
+            build = build_signal_matrix if self.signal_cache is None else self.signal_cache.build_signal_matrix
+            with phase("backtest.signals"):
+                self.signal_matrix = build(self.stocks, trading_days, workers=self.workers, config=self.config)
+
+        if self.vectorized_portfolio:
+            with phase("backtest.simulate"):
+                return self._run_vectorized(trading_days)
+
         total_days = len(trading_days)
-        for i, current_date in enumerate(trading_days):
-            if self.verbose and i % 50 == 0:
-                print(f"  [{i}/{total_days}] {current_date}")
+        with phase("backtest.simulate"):
+            for i, current_date in enumerate(trading_days):
+                if self.verbose and i % 50 == 0:
+                    print(f"  [{i}/{total_days}] {current_date}")
 
-            prices = self._get_prices(current_date)
+                prices = self._get_prices(current_date)
 
-            # Strategy: rebalance to stocks passing all signals
-            target_tickers = self._get_target_tickers(current_date)
-            self.strategy_portfolio.rebalance(target_tickers, prices, current_date)
+                # Strategy: rebalance to stocks passing all signals
+                target_tickers = self._get_target_tickers(current_date)
+                self.strategy_portfolio.rebalance(target_tickers, prices, current_date)
 
-            # Benchmark: buy on day 1, then just hold
-            if i == 0:
-                self.benchmark_portfolio.rebalance(all_tickers, prices, current_date)
-            else:
-                self.benchmark_portfolio.update_snapshot(prices, current_date)
+                # Benchmark: buy on day 1, then just hold
+                if i == 0:
+                    self.benchmark_portfolio.rebalance(all_tickers, prices, current_date)
+                else:
+                    self.benchmark_portfolio.update_snapshot(prices, current_date)
+            count("backtest.days", total_days)
 
         if self.verbose:
             print(f"  [{total_days}/{total_days}] Done")
@@ -51,28 +156,96 @@ class BacktestEngine:
             self.benchmark_portfolio.snapshots,
         )
 
+    @property
+    def trades(self) -> tuple[list[Trade], list[Trade]]:
+        """Trade ledgers of the last run as (strategy_trades, benchmark_trades)."""
+        if self.strategy_result is not None and self.benchmark_result is not None:
+            return self.strategy_result.trades, self.benchmark_result.trades
+        return self.strategy_portfolio.trades, self.benchmark_portfolio.trades
+
+    def analyze(self) -> tuple[BacktestMetrics, BacktestMetrics]:
+        """Metrics of the last run as (strategy_metrics, benchmark_metrics)."""
+        with phase("backtest.analyze"):
+            if self.strategy_result is not None and self.benchmark_result is not None:
+                return (
+                    analyze_equity(self.strategy_result.equity, self.strategy_result.trade_values),
+                    analyze_equity(self.benchmark_result.equity, self.benchmark_result.trade_values),
+                )
+            return (
+                analyze_backtest(self.strategy_portfolio.snapshots, self.strategy_portfolio.trades),
+                analyze_backtest(self.benchmark_portfolio.snapshots, self.benchmark_portfolio.trades),
+            )
+
+    def _run_vectorized(
+            self,
+            trading_days: list[date],
+    ) -> tuple[Sequence[DailySnapshot], Sequence[DailySnapshot]]:
+        """Simulate both portfolios at once over the aligned dates x tickers price matrix."""
+        if self.prices is not None and self.tickers is not None:
+            tickers, prices = self.tickers, self.prices
+        else:
+            tickers = [stock.info.ticker for stock in self.stocks]
+            prices = build_price_matrix(self.stocks, trading_days)
+
+        # Strategy: rebalance to stocks passing all signals
+        if self.signal_matrix is not None:
+            targets = self.signal_matrix.selected
+        else:
+            targets = np.zeros((len(trading_days), len(tickers)), dtype=bool)
+            for i, current_date in enumerate(trading_days):
+                target_tickers = self._get_target_tickers(current_date)
+                targets[i] = [ticker in target_tickers for ticker in tickers]
+        self.strategy_result = simulate_portfolio(
+            trading_days, tickers, prices, equal_weights(targets, prices),
+            rebalance=rebalance_mask(trading_days, targets, prices, self.policy),
+        )
+
+        # Benchmark: buy on day 1, then just hold
+        benchmark_rebalance = np.zeros(len(trading_days), dtype=bool)
+        benchmark_rebalance[:1] = True
+        self.benchmark_result = simulate_portfolio(
+            trading_days, tickers, prices, equal_weights(np.ones_like(targets), prices),
+            rebalance=benchmark_rebalance,
+        )
+
+        count("backtest.days", len(trading_days))
+        if self.verbose:
+            print(f"  [{len(trading_days)}/{len(trading_days)}] Done")
+
+        return self.strategy_result.snapshots, self.benchmark_result.snapshots
+
+    @traced("BacktestEngine._get_trading_days")
     def _get_trading_days(self) -> list[date]:
         """Get all trading days in the backtest period."""
-        all_dates: set[date] = set()
-        for stock in self.stocks:
-            for day in stock.history.daily.keys():
-                if self.start_date <= day <= self.end_date:
-                    all_dates.add(day)
-        return sorted(all_dates)
+        return _trading_dates(self.stocks, self.start_date, self.end_date).astype(object).tolist()
 
+    @traced("BacktestEngine._get_prices")
     def _get_prices(self, current_date: date) -> dict[str, float | None]:
         """Get prices for all stocks on a given date."""
         prices: dict[str, float | None] = {}
         for stock in self.stocks:
-            daily = stock.history.daily.get(current_date)
-            prices[stock.info.ticker] = daily.price if daily else None
+            daily = stock.history.daily
+            i = daily.index_of(current_date)
+            prices[stock.info.ticker] = float(daily.price[i]) if i >= 0 and not np.isnan(daily.price[i]) else None
         return prices
 
+    @traced("BacktestEngine._get_target_tickers")
     def _get_target_tickers(self, current_date: date) -> set[str]:
         """Get tickers that pass all signals on a given date."""
+        if self.signal_matrix is not None:
+            return self.signal_matrix.target_tickers(current_date)
+
         target_tickers: set[str] = set()
         for stock in self.stocks:
             analysis = analyze_stock(stock, target_date=current_date)
             if analysis.signals.all_signals_pass:
                 target_tickers.add(stock.info.ticker)
         return target_tickers
+
+
+def _trading_dates(stocks: list[Stock], start_date: date, end_date: date) -> np.ndarray:
+    """Sorted days in [start_date, end_date] on which any of `stocks` has a daily row."""
+    all_dates = [stock.history.daily.between(start_date, end_date).dates for stock in stocks]
+    if not all_dates:
+        return np.empty(0, dtype="datetime64[D]")
+    return np.unique(np.concatenate(all_dates))
@@ -1,26 +1,34 @@
-import math
+import numpy as np
+from numpy.typing import ArrayLike
+
+# Every metric takes one equity curve (1-D, returns a float) or many curves
+# stacked as a curves x days array (2-D, returns one value per curve).
 
 
 # =============================================================================
 # Total Return
 # =============================================================================
 
-def calc_total_return(equity_curve: list[float]) -> float:
+def calc_total_return(equity_curve: ArrayLike) -> float | np.ndarray:
     """
     Calculate Total Return.
 
     Total_Return = (Equity_end - Equity_start) / Equity_start
     """
-    if len(equity_curve) == 0 or equity_curve[0] == 0:
-        return 0.0
-    return (equity_curve[-1] - equity_curve[0]) / equity_curve[0]
+    equity = np.asarray(equity_curve, dtype=float)
+    if equity.shape[-1] == 0:
+        return _result(np.zeros(equity.shape[:-1]))
+    start = equity[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_return = np.where(start != 0, (equity[..., -1] - start) / start, 0.0)
+    return _result(total_return)
 
 
 # =============================================================================
 # Annual Return
 # =============================================================================
 
-def calc_annual_return(total_return: float, trading_days: int) -> float:
+def calc_annual_return(total_return: float | np.ndarray, trading_days: int) -> float | np.ndarray:
     """
     Calculate Annual Return (annualized return).
 
@@ -28,57 +36,103 @@ def calc_annual_return(total_return: float, trading_days: int) -> float:
     where years = trading_days / 252
     """
     if trading_days == 0:
-        return 0.0
+        return _result(np.zeros(np.shape(total_return)))
     years = trading_days / 252
-    return (1 + total_return) ** (1 / years) - 1
+    return _result((1 + np.asarray(total_return, dtype=float)) ** (1 / years) - 1)
 
 
 # =============================================================================
 # Max Drawdown
 # =============================================================================
 
-def calc_max_drawdown(equity_curve: list[float]) -> float:
+def calc_max_drawdown(equity_curve: ArrayLike) -> float | np.ndarray:
     """
     Calculate Max Drawdown (maximum peak-to-trough decline).
 
     Max_Drawdown = max((Peak_t - Equity_t) / Peak_t)
     """
-    if len(equity_curve) == 0:
-        return 0.0
-    peak = equity_curve[0]
-    max_drawdown = 0.0
-    for equity in equity_curve:
-        if equity > peak:
-            peak = equity
-        drawdown = (peak - equity) / peak
-        max_drawdown = max(max_drawdown, drawdown)
-    return max_drawdown
+    equity = np.asarray(equity_curve, dtype=float)
+    if equity.shape[-1] == 0:
+        return _result(np.zeros(equity.shape[:-1]))
+    return _result(np.maximum(calc_drawdown(equity).max(axis=-1), 0.0))
+
+
+def calc_drawdown(equity_curve: ArrayLike) -> np.ndarray:
+    """
+    Calculate the Drawdown curve.
+
+    Drawdown_t = (Peak_t - Equity_t) / Peak_t
+    where Peak_t = max(Equity_0..t)
+    """
+    equity = np.asarray(equity_curve, dtype=float)
+    peak = np.maximum.accumulate(equity, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(peak > 0, (peak - equity) / peak, 0.0)
 
 
 # =============================================================================
 # Sharpe Ratio
 # =============================================================================
 
-def calc_sharpe_ratio(equity_curve: list[float]) -> float:
+def calc_sharpe_ratio(equity_curve: ArrayLike) -> float | np.ndarray:
     """
     Calculate Sharpe Ratio (annualized).
 
     Sharpe_Ratio = (mean(daily_returns) / std(daily_returns)) * sqrt(252)
     """
-    if len(equity_curve) < 2:
-        return 0.0
+    equity = np.asarray(equity_curve, dtype=float)
+    if equity.shape[-1] < 2:
+        return _result(np.zeros(equity.shape[:-1]))
+
+    daily_returns, valid = calc_daily_returns(equity)
+    count = valid.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_return = daily_returns.sum(axis=-1) / count
+        deviations = np.where(valid, daily_returns - mean_return[..., None], 0.0)
+        std_return = np.sqrt((deviations ** 2).sum(axis=-1) / count)
+        sharpe_ratio = mean_return / std_return * np.sqrt(252)
+    return _result(np.where((count > 0) & (std_return > 0), sharpe_ratio, 0.0))
 
-    daily_returns = [
-        (equity_curve[i] - equity_curve[i - 1]) / equity_curve[i - 1]
-        for i in range(1, len(equity_curve))
-        if equity_curve[i - 1] > 0
-    ]
 
-    mean_return = sum(daily_returns) / len(daily_returns)
-    variance = sum((r - mean_return) ** 2 for r in daily_returns) / len(daily_returns)
-    std_return = math.sqrt(variance)
+def calc_daily_returns(equity_curve: ArrayLike) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate Daily Returns, with a mask of the days that have one.
+
+    Daily_Return_t = (Equity_t - Equity_t-1) / Equity_t-1, defined where Equity_t-1 > 0
+    """
+    equity = np.asarray(equity_curve, dtype=float)
+    previous = equity[..., :-1]
+    valid = previous > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        daily_returns = np.where(valid, (equity[..., 1:] - previous) / previous, 0.0)
+    return daily_returns, valid
 
-    if std_return == 0:
+
+# =============================================================================
+# Turnover
+# =============================================================================
+
+def calc_annual_turnover(trade_values: ArrayLike, equity_curve: ArrayLike) -> float:
+    """
+    Calculate Annual Turnover (one-way, as a fraction of average equity).
+
+    Annual_Turnover = (Σ|Trade_Value| / 2) / mean(Equity) / years
+    where years = trading_days / 252
+    """
+    equity = np.asarray(equity_curve, dtype=float)
+    if len(equity) == 0:
+        return 0.0
+    average_equity = equity.mean()
+    if average_equity == 0:
         return 0.0
+    years = len(equity) / 252
+    return float((np.abs(np.asarray(trade_values, dtype=float)).sum() / 2) / average_equity / years)
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
 
-    return (mean_return / std_return) * math.sqrt(252)
+def _result(values: np.ndarray) -> float | np.ndarray:
+    """A plain float for a single curve, the array for many."""
+    return float(values) if np.ndim(values) == 0 else values
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from datetime import date
+from enum import Enum
 
 
 @dataclass(frozen=True)
@@ -9,9 +10,53 @@ class DailySnapshot:
     positions: dict[str, float]  # ticker -> shares
 
 
+@dataclass(frozen=True)
+class Trade:
+    date: date
+    ticker: str
+    shares: float  # signed change in shares
+    price: float | None  # None when the position was closed without a valid price
+
+
 @dataclass(frozen=True)
 class BacktestMetrics:
     total_return: float
     annual_return: float
     max_drawdown: float
     sharpe_ratio: float
+    turnover: float = 0.0
+
+
+class RebalanceSchedule(Enum):
+    Daily = "daily"
+    Weekly = "weekly"
+    Monthly = "monthly"
+
+
+@dataclass(frozen=True)
+class RebalancePolicy:
+    schedule: RebalanceSchedule = RebalanceSchedule.Daily  # days on which a rebalance is considered
+    on_change_only: bool = False  # skip when the target set equals the one at the last rebalance
+    drift_threshold: float | None = None  # unchanged targets still rebalance past this weight drift
+
+
+SIGNAL_NAMES = ("ev_ebit_long_cycle", "ev_ebit_short_cycle", "ebit_positive", "ebit_growth_positive")
+
+
+@dataclass(frozen=True)
+class StrategyConfig:
+    ev_ebit_percentile: float = 25
+    ev_ebit_long_years: int = 5  # window of the ev_ebit_long_cycle signal
+    ev_ebit_short_years: int = 1  # window of the ev_ebit_short_cycle signal
+    signals: tuple[str, ...] = SIGNAL_NAMES  # signals the selection rule looks at
+    min_signals: int | None = None  # how many of `signals` must pass (None: all of them)
+
+    @property
+    def required_signals(self) -> int:
+        return len(self.signals) if self.min_signals is None else self.min_signals
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    config: StrategyConfig
+    metrics: BacktestMetrics
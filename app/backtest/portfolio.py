@@ -1,14 +1,21 @@
+import math
 from datetime import date
 
-from app.backtest.models import DailySnapshot
+from app.backtest.models import DailySnapshot, RebalancePolicy, RebalanceSchedule, Trade
+from app.core.profiling import traced
 
 
 class Portfolio:
-    def __init__(self):
+    def __init__(self, policy: RebalancePolicy = RebalancePolicy()):
+        self.policy = policy
         self.equity: float = 1.0
         self.positions: dict[str, float] = {}  # ticker -> shares
         self.snapshots: list[DailySnapshot] = []
+        self.trades: list[Trade] = []
+        self._last_date: date | None = None
+        self._last_targets: set[str] | None = None
 
+    @traced("Portfolio.rebalance")
     def rebalance(
             self,
             target_tickers: set[str],
@@ -16,24 +23,65 @@ class Portfolio:
             current_date: date,
     ) -> None:
         self._update_equity(prices)
-        self.positions.clear()
+
+        if not self._should_rebalance(target_tickers, prices, current_date):
+            self._append_snapshot(current_date)
+            return
 
         valid_tickers = [
             ticker for ticker in target_tickers
             if prices.get(ticker) is not None and prices[ticker] > 0
         ]
 
+        # Positions are replaced rather than mutated, so snapshots can share them
+        positions: dict[str, float] = {}
         if valid_tickers:
             weight_per_stock = self.equity / len(valid_tickers)
             for ticker in valid_tickers:
-                self.positions[ticker] = weight_per_stock / prices[ticker]
+                positions[ticker] = weight_per_stock / prices[ticker]
 
+        self._record_trades(positions, prices, current_date)
+        self.positions = positions
+        self._last_targets = set(target_tickers)
         self._append_snapshot(current_date)
 
     def update_snapshot(self, prices: dict[str, float | None], current_date: date) -> None:
         self._update_equity(prices)
         self._append_snapshot(current_date)
 
+    def _should_rebalance(
+            self,
+            target_tickers: set[str],
+            prices: dict[str, float | None],
+            current_date: date,
+    ) -> bool:
+        if self._last_targets is None:
+            return True
+        if not is_scheduled(self._last_date, current_date, self.policy.schedule):
+            return False
+        if not self.policy.on_change_only and self.policy.drift_threshold is None:
+            return True
+        if target_tickers != self._last_targets:
+            return True
+        return (
+                self.policy.drift_threshold is not None
+                and self._max_drift(prices) > self.policy.drift_threshold
+        )
+
+    def _max_drift(self, prices: dict[str, float | None]) -> float:
+        """Largest absolute gap between a holding's current weight and its equal target weight."""
+        if not self.positions:
+            return 0.0
+        if self.equity <= 0:
+            return math.inf
+        target_weight = 1 / len(self.positions)
+        drift = 0.0
+        for ticker, shares in self.positions.items():
+            price = prices.get(ticker)
+            value = shares * price if price is not None and price > 0 else 0.0
+            drift = max(drift, abs(value / self.equity - target_weight))
+        return drift
+
     def _update_equity(self, prices: dict[str, float | None]) -> None:
         if not self.positions:
             return
@@ -44,9 +92,36 @@ class Portfolio:
                 total += shares * price
         self.equity = total
 
+    def _record_trades(
+            self,
+            positions: dict[str, float],
+            prices: dict[str, float | None],
+            current_date: date,
+    ) -> None:
+        for ticker in sorted(self.positions.keys() | positions.keys()):
+            shares = positions.get(ticker, 0.0) - self.positions.get(ticker, 0.0)
+            if shares != 0:
+                price = prices.get(ticker)
+                self.trades.append(Trade(
+                    date=current_date,
+                    ticker=ticker,
+                    shares=shares,
+                    price=price if price is not None and price > 0 else None,
+                ))
+
     def _append_snapshot(self, current_date: date) -> None:
         self.snapshots.append(DailySnapshot(
             date=current_date,
             equity=self.equity,
-            positions=dict(self.positions),
+            positions=self.positions,
         ))
+        self._last_date = current_date
+
+
+def is_scheduled(previous_date: date | None, current_date: date, schedule: RebalanceSchedule) -> bool:
+    """Whether `current_date` is the first trading day of a new schedule period."""
+    if previous_date is None or schedule == RebalanceSchedule.Daily:
+        return True
+    if schedule == RebalanceSchedule.Weekly:
+        return previous_date.isocalendar()[:2] != current_date.isocalendar()[:2]
+    return (previous_date.year, previous_date.month) != (current_date.year, current_date.month)
@@ -1,6 +1,4 @@
-import matplotlib.pyplot as plt
-
-from app.backtest.models import BacktestMetrics, DailySnapshot
+from app.backtest.models import BacktestMetrics, DailySnapshot, SweepResult
 
 
 def print_backtest_report(
@@ -14,6 +12,7 @@ def print_backtest_report(
     _print_metric_row("Annual Return", strategy_metrics.annual_return, benchmark_metrics.annual_return, is_pct=True)
     _print_metric_row("Max Drawdown", strategy_metrics.max_drawdown, benchmark_metrics.max_drawdown, is_pct=True)
     _print_metric_row("Sharpe Ratio", strategy_metrics.sharpe_ratio, benchmark_metrics.sharpe_ratio, is_pct=False)
+    _print_metric_row("Turnover/Yr", strategy_metrics.turnover, benchmark_metrics.turnover, is_pct=True)
 
     excess_return = strategy_metrics.total_return - benchmark_metrics.total_return
     if excess_return > 0:
@@ -32,10 +31,31 @@ def _print_metric_row(label: str, strategy_val: float, benchmark_val: float, is_
     print(f"{label:<13} | {s_str:>8} | {b_str:>8}")
 
 
+def print_sweep_report(results: list[SweepResult], benchmark_metrics: BacktestMetrics) -> None:
+    print(f"\n{'Pct':>5} | {'Long':>4} | {'Short':>5} | {'Rule':<12} | {'Return':>8} | {'Annual':>8} | {'MaxDD':>8} | {'Sharpe':>6} | {'Turnover':>8}")
+    print(f"{'-' * 5}-+-{'-' * 4}-+-{'-' * 5}-+-{'-' * 12}-+-{'-' * 8}-+-{'-' * 8}-+-{'-' * 8}-+-{'-' * 6}-+-{'-' * 8}")
+
+    for result in sorted(results, key=lambda r: r.metrics.sharpe_ratio, reverse=True):
+        config = result.config
+        metrics = result.metrics
+        rule = f"{config.required_signals}/{len(config.signals)} signals"
+        print(
+            f"{config.ev_ebit_percentile:>5g} | {config.ev_ebit_long_years:>3}y | {config.ev_ebit_short_years:>4}y | {rule:<12} | "
+            f"{metrics.total_return:>+8.2%} | {metrics.annual_return:>+8.2%} | {metrics.max_drawdown:>+8.2%} | {metrics.sharpe_ratio:>6.2f} | {metrics.turnover:>8.2%}"
+        )
+
+    print(
+        f"\nBenchmark: Return {benchmark_metrics.total_return:+.2%} | Annual {benchmark_metrics.annual_return:+.2%} | "
+        f"MaxDD {benchmark_metrics.max_drawdown:+.2%} | Sharpe {benchmark_metrics.sharpe_ratio:.2f}"
+    )
+
+
 def plot_equity_curve(
         strategy_snapshots: list[DailySnapshot],
         benchmark_snapshots: list[DailySnapshot],
 ) -> None:
+    import matplotlib.pyplot as plt  # deferred: slow to import, and only plotting needs it
+
     dates = [s.date for s in strategy_snapshots]
     strategy_equity = [s.equity for s in strategy_snapshots]
     benchmark_equity = [b.equity for b in benchmark_snapshots]
@@ -0,0 +1,56 @@
+import json
+import os
+from dataclasses import asdict, dataclass
+from datetime import date
+from pathlib import Path
+
+from app.backtest.models import BacktestMetrics, DailySnapshot
+
+backtest_results_path = Path(__file__).parent.parent.parent.resolve() / "data" / "backtest" / "last_backtest.json"
+
+
+@dataclass(frozen=True)
+class BacktestResults:
+    """What the report of a finished backtest needs, so it can be shown again without rerunning."""
+    start_date: date
+    end_date: date
+    strategy_metrics: BacktestMetrics
+    benchmark_metrics: BacktestMetrics
+    strategy_snapshots: list[DailySnapshot]  # equity curves; positions are not kept
+    benchmark_snapshots: list[DailySnapshot]
+
+
+def save_backtest_results(results: BacktestResults, path: Path = backtest_results_path) -> None:
+    document = {
+        "start_date": str(results.start_date),
+        "end_date": str(results.end_date),
+        "strategy_metrics": asdict(results.strategy_metrics),
+        "benchmark_metrics": asdict(results.benchmark_metrics),
+        "dates": [str(snapshot.date) for snapshot in results.strategy_snapshots],
+        "strategy_equity": [snapshot.equity for snapshot in results.strategy_snapshots],
+        "benchmark_equity": [snapshot.equity for snapshot in results.benchmark_snapshots],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    temp_path.write_text(json.dumps(document), encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+def load_backtest_results(path: Path = backtest_results_path) -> BacktestResults | None:
+    """The last saved backtest, or None if none was saved."""
+    if not path.exists():
+        return None
+    document = json.loads(path.read_text(encoding="utf-8"))
+    dates = [date.fromisoformat(day) for day in document["dates"]]
+    return BacktestResults(
+        start_date=date.fromisoformat(document["start_date"]),
+        end_date=date.fromisoformat(document["end_date"]),
+        strategy_metrics=BacktestMetrics(**document["strategy_metrics"]),
+        benchmark_metrics=BacktestMetrics(**document["benchmark_metrics"]),
+        strategy_snapshots=[
+            DailySnapshot(day, equity, {}) for day, equity in zip(dates, document["strategy_equity"])
+        ],
+        benchmark_snapshots=[
+            DailySnapshot(day, equity, {}) for day, equity in zip(dates, document["benchmark_equity"])
+        ],
+    )
@@ -0,0 +1,116 @@
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from app.backtest.metrics import calc_daily_returns, calc_drawdown
+
+DEFAULT_WINDOWS = (63, 126, 252)  # ~3, 6 and 12 months of trading days
+
+
+@dataclass(frozen=True)
+class UnderwaterPeriod:
+    """Days from leaving a peak until it is regained (`end` is None while still underwater)."""
+    start: int  # first day below the peak
+    trough: int  # day of the deepest drawdown
+    end: int | None  # first day back at the peak
+    depth: float  # drawdown at the trough
+
+
+@dataclass
+class MetricSeries:
+    """
+    Day-by-day metrics of one equity curve (1-D arrays) or many (curves x days arrays).
+
+    Rolling values on day t cover the `window` daily returns ending on day t and
+    are NaN until a full window is available.
+    """
+    drawdown: np.ndarray
+    rolling_sharpe: dict[int, np.ndarray]  # window -> annualized Sharpe ratio
+    rolling_volatility: dict[int, np.ndarray]  # window -> annualized std of daily returns
+    underwater_periods: list[UnderwaterPeriod] | list[list[UnderwaterPeriod]]
+
+
+def compute_metric_series(
+        equity_curve: ArrayLike,
+        windows: tuple[int, ...] = DEFAULT_WINDOWS,
+) -> MetricSeries:
+    """Drawdown, rolling Sharpe/volatility for every window, and underwater periods in one pass."""
+    equity = np.asarray(equity_curve, dtype=float)
+    drawdown = calc_drawdown(equity)
+
+    # Running sums of daily returns (centered per curve to limit cancellation) shared by every window
+    daily_returns, valid = calc_daily_returns(equity)
+    count = valid.sum(axis=-1, keepdims=True)
+    center = np.divide(daily_returns.sum(axis=-1, keepdims=True), count, out=np.zeros(count.shape), where=count > 0)
+    centered = np.where(valid, daily_returns - center, 0.0)
+    sums = _running_sum(centered)
+    squares = _running_sum(centered ** 2)
+    counts = _running_sum(valid.astype(float))
+
+    rolling_sharpe: dict[int, np.ndarray] = {}
+    rolling_volatility: dict[int, np.ndarray] = {}
+    for window in windows:
+        n = _window_diff(counts, window)
+        full = ~np.isnan(n)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = _window_diff(sums, window) / n
+            second_moment = _window_diff(squares, window) / n
+            variance = second_moment - mean ** 2
+            # Differences of running sums leave rounding noise where the window is really constant
+            std = np.sqrt(np.where(variance > 1e-12 * second_moment, variance, 0.0))
+            sharpe = np.where(std > 0, (mean + center) / std * np.sqrt(252), 0.0)
+        # Full windows without a single valid return score 0, like the whole-curve metrics
+        rolling_sharpe[window] = _pad_front(np.where(full, sharpe, np.nan))
+        rolling_volatility[window] = _pad_front(np.where(full, np.nan_to_num(std) * np.sqrt(252), np.nan))
+
+    if drawdown.ndim == 1:
+        underwater_periods = find_underwater_periods(drawdown)
+    else:
+        underwater_periods = [find_underwater_periods(row) for row in drawdown]
+
+    return MetricSeries(
+        drawdown=drawdown,
+        rolling_sharpe=rolling_sharpe,
+        rolling_volatility=rolling_volatility,
+        underwater_periods=underwater_periods,
+    )
+
+
+def find_underwater_periods(drawdown: np.ndarray) -> list[UnderwaterPeriod]:
+    """Maximal runs of days with a positive drawdown in a single drawdown curve."""
+    underwater = np.concatenate(([False], drawdown > 0, [False]))
+    edges = np.flatnonzero(underwater[1:] != underwater[:-1])
+    starts, ends = edges[::2], edges[1::2]
+    if len(starts) == 0:
+        return []
+    depths = np.maximum.reduceat(drawdown, starts)
+    periods: list[UnderwaterPeriod] = []
+    for start, end, depth in zip(starts, ends, depths):
+        trough = start + int(np.argmax(drawdown[start:end]))
+        periods.append(UnderwaterPeriod(
+            start=int(start),
+            trough=int(trough),
+            end=int(end) if end < len(drawdown) else None,
+            depth=float(depth),
+        ))
+    return periods
+
+
+def _running_sum(values: np.ndarray) -> np.ndarray:
+    """Cumulative sum along days with a leading zero, so window sums are differences."""
+    zeros = np.zeros(values.shape[:-1] + (1,))
+    return np.concatenate((zeros, np.cumsum(values, axis=-1)), axis=-1)
+
+
+def _window_diff(running: np.ndarray, window: int) -> np.ndarray:
+    """Sum over the last `window` entries ending at each position, NaN before a full window."""
+    out = np.full(running.shape[:-1] + (running.shape[-1] - 1,), np.nan)
+    if window <= out.shape[-1]:
+        out[..., window - 1:] = running[..., window:] - running[..., :-window]
+    return out
+
+
+def _pad_front(values: np.ndarray) -> np.ndarray:
+    """Align per-return values with equity days (day 0 has no return)."""
+    return np.concatenate((np.full(values.shape[:-1] + (1,), np.nan), values), axis=-1)
@@ -0,0 +1,205 @@
+import os
+from dataclasses import dataclass
+from datetime import date
+from hashlib import blake2b
+from pathlib import Path
+
+import numpy as np
+
+from app.backtest.models import SIGNAL_NAMES, StrategyConfig
+from app.backtest.signal_matrix import SignalMatrix, build_signal_matrix
+from app.core.models import Stock, StockHistoricalData
+from app.core.profiling import count, traced
+
+signal_cache_dir_path = Path(__file__).parent.parent.parent.resolve() / "data" / "signal_cache"
+
+CACHE_VERSION = 1  # bump when the signal computation changes, invalidating every entry
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+
+@dataclass
+class _Block:
+    """Cached cells of one calendar year, valid while the history rows they read hash to `digest`."""
+    dates: np.ndarray  # datetime64[D], ascending
+    signals: np.ndarray  # len(SIGNAL_NAMES) x len(dates) booleans
+    digest: str
+
+
+class SignalCache:
+    """
+    On-disk cache of signal matrix cells, so repeated backtests only compute the cells they have not seen.
+
+    There is one file per (ticker, EV/EBIT windows) under `path`, holding that ticker's cells in
+    calendar-year blocks. A cell on day d only reads the daily EV/EBIT rows of the trailing
+    percentile window [d - years, d] and the filed quarters, so each block keeps a hash of exactly
+    those rows; a block whose rows have changed (a refetch, a different load window) is recomputed,
+    while rows appended after it leave it valid. Files are evicted least recently used first
+    once the cache outgrows `max_bytes`.
+    """
+
+    def __init__(self, path: Path = signal_cache_dir_path, max_bytes: int = MAX_CACHE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        # Cells served from the cache and computed, over this instance's lifetime
+        self.hits = 0
+        self.misses = 0
+
+    @traced("SignalCache.build_signal_matrix")
+    def build_signal_matrix(
+            self,
+            stocks: list[Stock],
+            dates: list[date],
+            workers: int = 1,
+            config: StrategyConfig = StrategyConfig(),
+    ) -> SignalMatrix:
+        """`build_signal_matrix` that only computes the (date, ticker) cells missing from the cache."""
+        days = np.array(dates, dtype="datetime64[D]")
+        years = days.astype("datetime64[Y]")
+        lookback = 365 * max(config.ev_ebit_long_years, config.ev_ebit_short_years)
+        signals = np.zeros((len(SIGNAL_NAMES), len(dates), len(stocks)), dtype=bool)
+        missing = np.ones((len(dates), len(stocks)), dtype=bool)
+
+        entries: list[dict[np.datetime64, _Block]] = []
+        for j, stock in enumerate(stocks):
+            blocks = self._read(self._entry_path(stock.info.ticker, config))
+            for year in np.unique(years):
+                block = blocks.get(year)
+                if block is None:
+                    continue
+                if block.digest != _rows_digest(stock.history, block.dates[0], block.dates[-1], lookback):
+                    del blocks[year]
+                    continue
+                rows = np.flatnonzero(years == year)
+                idx = np.searchsorted(block.dates, days[rows]).clip(max=len(block.dates) - 1)
+                found = block.dates[idx] == days[rows]
+                signals[:, rows[found], j] = block.signals[:, idx[found]]
+                missing[rows[found], j] = False
+            entries.append(blocks)
+
+        # Stocks missing the same days (typically all of them) are computed together in one pass
+        groups: dict[bytes, list[int]] = {}
+        for j in np.flatnonzero(missing.any(axis=0)):
+            groups.setdefault(np.packbits(missing[:, j]).tobytes(), []).append(int(j))
+        for columns in groups.values():
+            rows = np.flatnonzero(missing[:, columns[0]])
+            computed = build_signal_matrix(
+                [stocks[j] for j in columns], [dates[i] for i in rows], workers=workers, config=config,
+            )
+            for k, name in enumerate(SIGNAL_NAMES):
+                signals[k][np.ix_(rows, columns)] = getattr(computed, name)
+            for j in columns:
+                self._add_cells(entries[j], stocks[j].history, days[rows], signals[:, rows, j], lookback)
+                self._write(self._entry_path(stocks[j].info.ticker, config), entries[j])
+
+        misses = int(missing.sum())
+        self.hits += missing.size - misses
+        self.misses += misses
+        count("signal_cache.hits", missing.size - misses)
+        count("signal_cache.misses", misses)
+        self.evict()
+        return SignalMatrix(
+            dates=list(dates),
+            tickers=[stock.info.ticker for stock in stocks],
+            **{name: signals[k] for k, name in enumerate(SIGNAL_NAMES)},
+            config=config,
+        )
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits in `max_bytes`."""
+        if not self.path.exists():
+            return
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".npz"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        if self.path.exists():
+            for path in self.path.glob("*.npz"):
+                path.unlink(missing_ok=True)
+
+    def _entry_path(self, ticker: str, config: StrategyConfig) -> Path:
+        # Only the EV/EBIT windows change cell values; the selection rule is applied afterwards
+        key = (CACHE_VERSION, ticker, config.ev_ebit_percentile, config.ev_ebit_long_years, config.ev_ebit_short_years)
+        return self.path / f"{blake2b(repr(key).encode(), digest_size=16).hexdigest()}.npz"
+
+    @staticmethod
+    def _add_cells(
+            blocks: dict[np.datetime64, _Block],
+            history: StockHistoricalData,
+            days: np.ndarray,
+            signals: np.ndarray,
+            lookback: int,
+    ) -> None:
+        """Merge cells computed from `history` into their year blocks, rehashing the blocks they touch."""
+        years = days.astype("datetime64[Y]")
+        for year in np.unique(years):
+            in_year = years == year
+            block_dates, block_signals = days[in_year], signals[:, in_year]
+            block = blocks.get(year)
+            if block is not None:
+                keep = ~np.isin(block.dates, block_dates)
+                block_dates = np.concatenate([block.dates[keep], block_dates])
+                block_signals = np.concatenate([block.signals[:, keep], block_signals], axis=1)
+                order = np.argsort(block_dates)
+                block_dates, block_signals = block_dates[order], block_signals[:, order]
+            blocks[year] = _Block(
+                dates=block_dates,
+                signals=block_signals,
+                digest=_rows_digest(history, block_dates[0], block_dates[-1], lookback),
+            )
+
+    @staticmethod
+    def _read(path: Path) -> dict[np.datetime64, _Block]:
+        """The year blocks stored at `path`; a missing or unreadable file is an empty entry."""
+        try:
+            with np.load(path) as archive:
+                dates, signals = archive["dates"], archive["signals"]
+                block_years, digests = archive["block_years"], archive["digests"]
+        except (OSError, ValueError, KeyError):
+            return {}
+        os.utime(path)  # the modification time is the LRU clock
+
+        years = dates.astype("datetime64[Y]")
+        blocks = {}
+        for year, digest in zip(block_years, digests):
+            in_year = years == year
+            blocks[year] = _Block(dates=dates[in_year], signals=signals[:, in_year], digest=str(digest))
+        return blocks
+
+    @staticmethod
+    def _write(path: Path, blocks: dict[np.datetime64, _Block]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        ordered = [blocks[year] for year in sorted(blocks)]
+        temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp_path, "wb") as f:
+            np.savez(
+                f,
+                dates=np.concatenate([block.dates for block in ordered]),
+                signals=np.concatenate([block.signals for block in ordered], axis=1),
+                block_years=np.array(sorted(blocks), dtype="datetime64[Y]"),
+                digests=np.array([block.digest for block in ordered]),
+            )
+        os.replace(temp_path, path)
+
+
+def _rows_digest(history: StockHistoricalData, first_day: np.datetime64, last_day: np.datetime64, lookback: int) -> str:
+    """
+    Hash of the history rows read by cells in [first_day, last_day]: daily dates and EV/EBIT
+    from `lookback` days before the first cell up to the last, and the filed EBIT of every quarter.
+    """
+    daily, quarterly = history.daily, history.quarterly
+    lo = int(np.searchsorted(daily.dates, first_day - np.timedelta64(lookback, "D")))
+    hi = int(np.searchsorted(daily.dates, last_day, side="right"))
+    digest = blake2b(digest_size=16)
+    for column in (daily.dates[lo:hi], daily.ev_ebit[lo:hi], quarterly.dates, quarterly.filing_date, quarterly.ebit):
+        digest.update(np.ascontiguousarray(column).tobytes())
+    return digest.hexdigest()
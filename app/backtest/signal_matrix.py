@@ -0,0 +1,186 @@
+from dataclasses import dataclass, field
+from datetime import date
+from functools import cached_property
+
+import numpy as np
+
+from app.backtest.models import StrategyConfig
+from app.core.models import Stock, StockSignals
+from app.core.parallel import map_stocks
+from app.core.profiling import traced
+from app.core.timeline import (
+    compute_ebit_timeline,
+    compute_ev_ebit_percentiles_timeline,
+    compute_ev_ebit_timeline,
+    signal_ev_ebit_cycle_timeline,
+)
+
+EvEbitWindow = tuple[int, float]  # (years, percentile)
+
+
+@dataclass
+class SignalMatrix:
+    """
+    StockSignals for every (date, ticker) pair as dense dates x tickers boolean arrays.
+
+    The EV/EBIT cycle signals use the config's long and short windows, which are only the
+    5 and 1 years of StockSignals under the default config; `ev_ebit_5y_cycle` and
+    `ev_ebit_1y_cycle` remain as aliases of the long and short signals.
+    """
+    dates: list[date]
+    tickers: list[str]
+    ev_ebit_long_cycle: np.ndarray
+    ev_ebit_short_cycle: np.ndarray
+    ebit_positive: np.ndarray
+    ebit_growth_positive: np.ndarray
+    config: StrategyConfig = field(default_factory=StrategyConfig)
+
+    def __post_init__(self):
+        self._date_index = {day: i for i, day in enumerate(self.dates)}
+        self._ticker_index = {ticker: j for j, ticker in enumerate(self.tickers)}
+
+    @property
+    def ev_ebit_5y_cycle(self) -> np.ndarray:
+        return self.ev_ebit_long_cycle
+
+    @property
+    def ev_ebit_1y_cycle(self) -> np.ndarray:
+        return self.ev_ebit_short_cycle
+
+    @property
+    def all_signals_pass(self) -> np.ndarray:
+        return (
+                self.ev_ebit_long_cycle
+                & self.ev_ebit_short_cycle
+                & self.ebit_positive
+                & self.ebit_growth_positive
+        )
+
+    @cached_property
+    def selected(self) -> np.ndarray:
+        """Cells selected by the config's signal-combination rule."""
+        passed = sum(getattr(self, name).astype(np.int8) for name in self.config.signals)
+        return passed >= self.config.required_signals
+
+    def target_tickers(self, day: date) -> set[str]:
+        """Get tickers selected by the strategy on a given date."""
+        row = self._date_index[day]
+        return {self.tickers[j] for j in np.flatnonzero(self.selected[row])}
+
+    def signals(self, day: date, ticker: str) -> StockSignals:
+        i = self._date_index[day]
+        j = self._ticker_index[ticker]
+        return StockSignals(
+            ev_ebit_5y_cycle=bool(self.ev_ebit_long_cycle[i, j]),
+            ev_ebit_1y_cycle=bool(self.ev_ebit_short_cycle[i, j]),
+            ebit_positive=bool(self.ebit_positive[i, j]),
+            ebit_growth_positive=bool(self.ebit_growth_positive[i, j]),
+        )
+
+
+@dataclass
+class SignalInputs:
+    """Config-independent intermediates shared by every strategy variant (dates x tickers)."""
+    dates: list[date]
+    tickers: list[str]
+    ev_ebit: np.ndarray
+    ebit_positive: np.ndarray
+    ebit_growth_positive: np.ndarray
+    ev_ebit_percentiles: dict[EvEbitWindow, np.ndarray]
+
+    def signal_matrix(self, config: StrategyConfig) -> SignalMatrix:
+        long_q = self.ev_ebit_percentiles[(config.ev_ebit_long_years, config.ev_ebit_percentile)]
+        short_q = self.ev_ebit_percentiles[(config.ev_ebit_short_years, config.ev_ebit_percentile)]
+        return SignalMatrix(
+            dates=self.dates,
+            tickers=self.tickers,
+            ev_ebit_long_cycle=signal_ev_ebit_cycle_timeline(self.ev_ebit, long_q),
+            ev_ebit_short_cycle=signal_ev_ebit_cycle_timeline(self.ev_ebit, short_q),
+            ebit_positive=self.ebit_positive,
+            ebit_growth_positive=self.ebit_growth_positive,
+            config=config,
+        )
+
+
+def build_signal_matrix(
+        stocks: list[Stock],
+        dates: list[date],
+        workers: int = 1,
+        config: StrategyConfig = StrategyConfig(),
+) -> SignalMatrix:
+    """Compute signals for every stock on every date, one vectorized pass per stock."""
+    return compute_signal_inputs(stocks, dates, [config], workers=workers).signal_matrix(config)
+
+
+def concat_signal_matrices(matrices: list[SignalMatrix]) -> SignalMatrix:
+    """Join signal matrices of disjoint ticker shards, computed over the same dates and config."""
+    assert matrices
+    first = matrices[0]
+    assert all(matrix.dates == first.dates and matrix.config == first.config for matrix in matrices)
+    return SignalMatrix(
+        dates=first.dates,
+        tickers=[ticker for matrix in matrices for ticker in matrix.tickers],
+        ev_ebit_long_cycle=np.hstack([matrix.ev_ebit_long_cycle for matrix in matrices]),
+        ev_ebit_short_cycle=np.hstack([matrix.ev_ebit_short_cycle for matrix in matrices]),
+        ebit_positive=np.hstack([matrix.ebit_positive for matrix in matrices]),
+        ebit_growth_positive=np.hstack([matrix.ebit_growth_positive for matrix in matrices]),
+        config=first.config,
+    )
+
+
+@traced("compute_signal_inputs")
+def compute_signal_inputs(
+        stocks: list[Stock],
+        dates: list[date],
+        configs: list[StrategyConfig],
+        workers: int = 1,
+) -> SignalInputs:
+    """Compute the intermediates needed by all `configs` once, one pass per stock."""
+    windows: dict[int, list[float]] = {}
+    for config in configs:
+        for years in (config.ev_ebit_long_years, config.ev_ebit_short_years):
+            percentiles = windows.setdefault(years, [])
+            if config.ev_ebit_percentile not in percentiles:
+                percentiles.append(config.ev_ebit_percentile)
+
+    shape = (len(dates), len(stocks))
+    ev_ebit = np.full(shape, np.nan)
+    ebit_positive = np.zeros(shape, dtype=bool)
+    ebit_growth_positive = np.zeros(shape, dtype=bool)
+    ev_ebit_percentiles = {
+        (years, percentile): np.full(shape, np.nan)
+        for years, percentiles in windows.items()
+        for percentile in percentiles
+    }
+
+    for j, stock_inputs in enumerate(map_stocks(_compute_stock_inputs, stocks, dates, windows, workers=workers)):
+        stock_ev_ebit, ebit_ttm, ebit_growth, stock_percentiles = stock_inputs
+        ev_ebit[:, j] = stock_ev_ebit
+        ebit_positive[:, j] = ebit_ttm > 0
+        ebit_growth_positive[:, j] = ebit_growth > 0
+        for years, values in stock_percentiles.items():
+            for k, percentile in enumerate(windows[years]):
+                ev_ebit_percentiles[(years, percentile)][:, j] = values[:, k]
+
+    return SignalInputs(
+        dates=list(dates),
+        tickers=[stock.info.ticker for stock in stocks],
+        ev_ebit=ev_ebit,
+        ebit_positive=ebit_positive,
+        ebit_growth_positive=ebit_growth_positive,
+        ev_ebit_percentiles=ev_ebit_percentiles,
+    )
+
+
+def _compute_stock_inputs(
+        stock: Stock,
+        dates: list[date],
+        windows: dict[int, list[float]],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, dict[int, np.ndarray]]:
+    ev_ebit = compute_ev_ebit_timeline(stock.history, dates)
+    ebit_ttm, ebit_growth = compute_ebit_timeline(stock.history, dates)
+    percentiles = {
+        years: compute_ev_ebit_percentiles_timeline(stock.history, dates, years, window_percentiles)[0]
+        for years, window_percentiles in windows.items()
+    }
+    return ev_ebit, ebit_ttm, ebit_growth, percentiles
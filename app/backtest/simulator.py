@@ -0,0 +1,222 @@
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date
+from typing import overload
+
+import numpy as np
+
+from app.backtest.models import DailySnapshot, RebalancePolicy, Trade
+from app.backtest.portfolio import is_scheduled
+from app.core.models import Stock
+from app.core.profiling import traced
+
+
+@dataclass
+class SimulationResult:
+    """
+    Equity curve plus positions stored sparsely: shares are kept only for the days they change.
+    """
+    dates: list[date]
+    tickers: list[str]
+    equity: np.ndarray
+    change_days: np.ndarray  # day indices where positions were reset
+    change_tickers: list[np.ndarray]  # per change: ticker indices held from that day on
+    change_shares: list[np.ndarray]  # per change: shares of those tickers
+    prices: np.ndarray
+
+    @property
+    def trades(self) -> list[Trade]:
+        """Trade ledger rebuilt from the position changes."""
+        trades: list[Trade] = []
+        held = np.zeros(len(self.tickers))
+        for day, tickers, shares in zip(self.change_days, self.change_tickers, self.change_shares):
+            target = np.zeros(len(self.tickers))
+            target[tickers] = shares
+            for j in sorted(np.flatnonzero(target != held), key=lambda j: self.tickers[j]):
+                price = self.prices[day, j]
+                trades.append(Trade(
+                    date=self.dates[day],
+                    ticker=self.tickers[j],
+                    shares=float(target[j] - held[j]),
+                    price=float(price) if price > 0 else None,
+                ))
+            held = target
+        return trades
+
+    @property
+    def trade_values(self) -> np.ndarray:
+        """Signed value of every trade with a valid price, without building the ledger."""
+        shares = np.zeros((len(self.change_days), len(self.tickers)))
+        for k, (tickers, change_shares) in enumerate(zip(self.change_tickers, self.change_shares)):
+            shares[k, tickers] = change_shares
+        traded = np.diff(shares, axis=0, prepend=0.0)
+        prices = self.prices[self.change_days]
+        return (traded * prices)[(traded != 0) & _valid_prices(prices)]
+
+    @property
+    def snapshots(self) -> "SnapshotSequence":
+        return SnapshotSequence(self)
+
+    def positions(self, i: int) -> dict[str, float]:
+        """Positions held at the end of day `i` (ticker -> shares)."""
+        k = int(np.searchsorted(self.change_days, i, side="right")) - 1
+        if k < 0:
+            return {}
+        return {
+            self.tickers[j]: float(shares)
+            for j, shares in zip(self.change_tickers[k], self.change_shares[k])
+        }
+
+
+class SnapshotSequence(Sequence[DailySnapshot]):
+    """Read-only list of DailySnapshot rebuilt on access from a SimulationResult."""
+
+    def __init__(self, result: SimulationResult):
+        self.result = result
+
+    @overload
+    def __getitem__(self, i: int) -> DailySnapshot: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> list[DailySnapshot]: ...
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return DailySnapshot(
+            date=self.result.dates[i],
+            equity=float(self.result.equity[i]),
+            positions=self.result.positions(i),
+        )
+
+    def __len__(self) -> int:
+        return len(self.result.dates)
+
+
+@traced("build_price_matrix")
+def build_price_matrix(stocks: list[Stock], dates: list[date]) -> np.ndarray:
+    """Aligned dates x tickers close prices (NaN where a stock has no price that day)."""
+    days = np.array(dates, dtype="datetime64[D]")
+    prices = np.full((len(dates), len(stocks)), np.nan)
+    for j, stock in enumerate(stocks):
+        daily = stock.history.daily
+        idx = np.searchsorted(daily.dates, days)
+        found = idx < len(daily.dates)
+        found[found] = daily.dates[idx[found]] == days[found]
+        prices[found, j] = daily.price[idx[found]]
+    return prices
+
+
+def equal_weights(targets: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    """Equal weights over the targeted tickers that have a valid price on each day."""
+    valid = targets & _valid_prices(prices)
+    counts = valid.sum(axis=1, keepdims=True)
+    return np.divide(valid, counts, out=np.zeros(valid.shape), where=counts > 0)
+
+
+@traced("simulate_portfolio")
+def simulate_portfolio(
+        dates: list[date],
+        tickers: list[str],
+        prices: np.ndarray,
+        weights: np.ndarray,
+        rebalance: np.ndarray,
+) -> SimulationResult:
+    """
+    Vectorized equivalent of driving a Portfolio day by day.
+
+    On rebalance days positions are reset to `weights` of the current equity; on other
+    days they are held. Equity is marked to the day's prices, and holdings without a
+    valid price that day are valued at zero, exactly as Portfolio does.
+    """
+    valid = _valid_prices(prices)
+    marked_prices = np.where(valid, prices, 0.0)
+
+    # Shares per unit of equity established on each rebalance day
+    change_days = np.flatnonzero(rebalance)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        units = np.where(
+            (weights[change_days] > 0) & valid[change_days],
+            weights[change_days] / prices[change_days],
+            0.0,
+        )
+    has_positions = units.any(axis=1)
+
+    # Equity carried into each rebalance day: previous holdings marked to that day's prices
+    growth = np.ones(len(change_days))
+    if len(change_days) > 1:
+        carried = np.einsum("ij,ij->i", units[:-1], marked_prices[change_days[1:]])
+        growth[1:] = np.where(has_positions[:-1], carried, 1.0)
+    equity_at_change = np.cumprod(growth)
+
+    # Equity on every day from the holdings of the latest rebalance
+    equity = np.ones(len(dates))
+    change_of_day = np.searchsorted(change_days, np.arange(len(dates)), side="right") - 1
+    held = change_of_day >= 0
+    k = change_of_day[held]
+    marked = np.einsum("ij,ij->i", units[k], marked_prices[held])
+    equity[held] = np.where(has_positions[k], equity_at_change[k] * marked, equity_at_change[k])
+    equity[change_days] = equity_at_change
+
+    change_tickers = [np.flatnonzero(row) for row in units]
+    change_shares = [equity_at_change[k] * units[k, idx] for k, idx in enumerate(change_tickers)]
+
+    return SimulationResult(
+        dates=list(dates),
+        tickers=list(tickers),
+        equity=equity,
+        change_days=change_days,
+        change_tickers=change_tickers,
+        change_shares=change_shares,
+        prices=prices,
+    )
+
+
+def rebalance_mask(
+        dates: list[date],
+        targets: np.ndarray,
+        prices: np.ndarray,
+        policy: RebalancePolicy,
+) -> np.ndarray:
+    """Days on which a Portfolio driven with `policy` rebalances to the equal-weighted `targets`."""
+    scheduled = np.array(
+        [is_scheduled(dates[i - 1] if i > 0 else None, day, policy.schedule) for i, day in enumerate(dates)],
+        dtype=bool,
+    )
+    if not policy.on_change_only and policy.drift_threshold is None:
+        return scheduled
+
+    mask = np.zeros(len(dates), dtype=bool)
+    last = -1
+    for i in np.flatnonzero(scheduled):
+        if (
+                last < 0
+                or (targets[i] != targets[last]).any()
+                or (policy.drift_threshold is not None and _max_drift(targets, prices, last, i) > policy.drift_threshold)
+        ):
+            mask[i] = True
+            last = i
+    return mask
+
+
+def _max_drift(targets: np.ndarray, prices: np.ndarray, rebalanced: int, current: int) -> float:
+    """Largest gap between current and equal target weights of the holdings set on day `rebalanced`."""
+    target_weights = equal_weights(targets[rebalanced:rebalanced + 1], prices[rebalanced:rebalanced + 1])[0]
+    held = target_weights > 0
+    if not held.any():
+        return 0.0
+    current_prices = prices[current, held]
+    values = np.where(current_prices > 0, target_weights[held] / prices[rebalanced, held] * current_prices, 0.0)
+    total = values.sum()
+    if total <= 0:
+        return math.inf
+    return float(np.abs(values / total - target_weights[held]).max())
+
+
+def _valid_prices(prices: np.ndarray) -> np.ndarray:
+    return prices > 0  # NaN (no price) compares False
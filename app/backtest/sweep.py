@@ -0,0 +1,89 @@
+from datetime import date
+from itertools import product
+
+import numpy as np
+
+from app.backtest.analyzer import analyze_equity, analyze_equity_curves
+from app.backtest.engine import BacktestEngine
+from app.backtest.models import BacktestMetrics, RebalancePolicy, StrategyConfig, SweepResult, SIGNAL_NAMES
+from app.backtest.signal_matrix import compute_signal_inputs
+from app.backtest.simulator import build_price_matrix, equal_weights, rebalance_mask, simulate_portfolio
+from app.core.models import Stock
+
+
+class ParameterSweep(BacktestEngine):
+    """Backtest many strategy variants over the same stocks and period, sharing precomputed data."""
+
+    def __init__(
+            self,
+            stocks: list[Stock],
+            start_date: date,
+            end_date: date,
+            configs: list[StrategyConfig],
+            verbose: bool = False,
+            workers: int = 1,
+            policy: RebalancePolicy = RebalancePolicy(),
+    ):
+        super().__init__(stocks, start_date, end_date, verbose=verbose, workers=workers, policy=policy)
+        self.configs = configs
+
+    def run_sweep(self) -> tuple[list[SweepResult], BacktestMetrics]:
+        """Run every config and return (per-config results, benchmark metrics)."""
+        trading_days = self._get_trading_days()
+
+        # EV/EBIT series, TTM, growth and every needed rolling percentile, computed once
+        if self.verbose:
+            print(f"  Precomputing signal inputs for {len(self.stocks)} stocks ({self.workers} workers)...")
+        inputs = compute_signal_inputs(self.stocks, trading_days, self.configs, workers=self.workers)
+        tickers = [stock.info.ticker for stock in self.stocks]
+        prices = build_price_matrix(self.stocks, trading_days)
+
+        # Benchmark: buy on day 1, then just hold
+        benchmark_rebalance = np.zeros(len(trading_days), dtype=bool)
+        benchmark_rebalance[:1] = True
+        benchmark = simulate_portfolio(
+            trading_days, tickers, prices, equal_weights(np.ones(prices.shape, dtype=bool), prices),
+            rebalance=benchmark_rebalance,
+        )
+
+        equity_curves = np.empty((len(self.configs), len(trading_days)))
+        trade_values: list[np.ndarray] = []
+        for n, config in enumerate(self.configs, 1):
+            if self.verbose and n % 10 == 0:
+                print(f"  [{n}/{len(self.configs)}] configs")
+            targets = inputs.signal_matrix(config).selected
+            strategy = simulate_portfolio(
+                trading_days, tickers, prices, equal_weights(targets, prices),
+                rebalance=rebalance_mask(trading_days, targets, prices, self.policy),
+            )
+            equity_curves[n - 1] = strategy.equity
+            trade_values.append(strategy.trade_values)
+
+        results = [
+            SweepResult(config=config, metrics=metrics)
+            for config, metrics in zip(self.configs, analyze_equity_curves(equity_curves, trade_values))
+        ]
+        return results, analyze_equity(benchmark.equity, benchmark.trade_values)
+
+
+def make_grid(
+        ev_ebit_percentiles: list[float],
+        ev_ebit_long_years: list[int],
+        ev_ebit_short_years: list[int],
+        signal_rules: list[tuple[tuple[str, ...], int | None]] | None = None,
+) -> list[StrategyConfig]:
+    """Cartesian product of the given parameter values; a signal rule is (signals, min_signals)."""
+    if signal_rules is None:
+        signal_rules = [(SIGNAL_NAMES, None)]
+    return [
+        StrategyConfig(
+            ev_ebit_percentile=percentile,
+            ev_ebit_long_years=long_years,
+            ev_ebit_short_years=short_years,
+            signals=signals,
+            min_signals=min_signals,
+        )
+        for percentile, long_years, short_years, (signals, min_signals) in product(
+            ev_ebit_percentiles, ev_ebit_long_years, ev_ebit_short_years, signal_rules,
+        )
+    ]
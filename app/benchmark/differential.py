@@ -0,0 +1,149 @@
+import math
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from app.backtest.engine import BacktestEngine
+from app.backtest.models import SIGNAL_NAMES
+from app.backtest.signal_matrix import build_signal_matrix, compute_signal_inputs
+from app.benchmark.models import DifferentialResult
+from app.benchmark.suite import sample_stocks
+from app.core.analyzer import analyze_stock
+from app.core.models import Stock, StockHistoricalData, StockLiveData
+from app.core.pit import compute_pit_ev_ebit, compute_pit_ev_ebit_series
+from app.core.summary import compute_cycle_summary
+from app.data.historical_data_storage import load_historical_data, save_historical_data
+
+DIFFERENTIAL_SAMPLE = 20  # tickers checked per path
+EQUITY_TOLERANCE = 1e-9  # relative; the vectorized simulator reorders float operations
+
+
+def run_differential(
+        stocks: list[Stock],
+        start_date: date,
+        end_date: date,
+        sample: int = DIFFERENTIAL_SAMPLE,
+        every: int = 21,
+        workers: int = 1,
+) -> list[DifferentialResult]:
+    """
+    Check each optimized path against the reference implementation it replaced.
+
+    Signals are compared on every `every`-th trading day. The parallel check only
+    runs when `workers` > 1.
+    """
+    stocks = sample_stocks(stocks, sample)
+    results = [
+        check_pit_ev_ebit(stocks),
+        check_signal_matrix(stocks, start_date, end_date, every),
+        check_portfolio(stocks, start_date, end_date),
+        check_storage(stocks),
+        check_cycle_summary(stocks),
+    ]
+    if workers > 1:
+        results.append(check_parallel(stocks, start_date, end_date, workers))
+    return results
+
+
+def check_pit_ev_ebit(stocks: list[Stock]) -> DifferentialResult:
+    """compute_pit_ev_ebit_series against compute_pit_ev_ebit day by day (bit-exact)."""
+    checked = mismatches = 0
+    for stock in stocks:
+        daily = stock.history.daily
+        records = sorted(stock.history.quarterly.items())
+        series = compute_pit_ev_ebit_series(daily.dates, daily.price, records)
+        for day, price, value in zip(daily.dates.astype(object), daily.price, series):
+            if np.isnan(price):
+                continue
+            expected = compute_pit_ev_ebit(day, float(price), records)
+            checked += 1
+            if (expected is None) != np.isnan(value) or (expected is not None and expected != value):
+                mismatches += 1
+    return DifferentialResult("compute_pit_ev_ebit_series", checked, mismatches, max_error=0.0)
+
+
+def check_signal_matrix(stocks: list[Stock], start_date: date, end_date: date, every: int) -> DifferentialResult:
+    """build_signal_matrix against analyze_stock on sampled days (exact)."""
+    trading_days = BacktestEngine(stocks, start_date, end_date)._get_trading_days()
+    matrix = build_signal_matrix(stocks, trading_days)
+    checked = mismatches = 0
+    for day in trading_days[::every]:
+        for stock in stocks:
+            checked += 1
+            if analyze_stock(stock, target_date=day).signals != matrix.signals(day, stock.info.ticker):
+                mismatches += 1
+    return DifferentialResult("build_signal_matrix", checked, mismatches, max_error=0.0)
+
+
+def check_portfolio(stocks: list[Stock], start_date: date, end_date: date) -> DifferentialResult:
+    """Vectorized simulator against the Portfolio loop, for strategy and benchmark equity."""
+    vectorized = BacktestEngine(stocks, start_date, end_date).run()
+    loop = BacktestEngine(stocks, start_date, end_date, vectorized_portfolio=False).run()
+    checked = mismatches = 0
+    max_error = 0.0
+    for optimized, reference in zip(vectorized, loop):
+        if len(optimized) != len(reference):
+            mismatches += 1
+        for got, expected in zip(optimized, reference):
+            checked += 1
+            error = _relative_error(got.equity, expected.equity)
+            max_error = max(max_error, error)
+            if got.date != expected.date or error > EQUITY_TOLERANCE:
+                mismatches += 1
+    return DifferentialResult("simulate_portfolio", checked, mismatches, max_error)
+
+
+def check_storage(stocks: list[Stock]) -> DifferentialResult:
+    """Stored histories load back with identical columns."""
+    checked = mismatches = 0
+    with tempfile.TemporaryDirectory(prefix="quant-diff-") as directory:
+        path = Path(directory) / "historical_data"
+        save_historical_data({stock.info.ticker: stock.history for stock in stocks}, path)
+        loaded = load_historical_data(path=path)
+        for stock in stocks:
+            history = loaded.get(stock.info.ticker)
+            for table in ("daily", "quarterly"):
+                original = getattr(stock.history, table)
+                for name, column in vars(original).items():
+                    checked += 1
+                    restored = None if history is None else getattr(getattr(history, table), name, None)
+                    if restored is None or not np.array_equal(column, restored, equal_nan=True):
+                        mismatches += 1
+    return DifferentialResult("load_historical_data", checked, mismatches, max_error=0.0)
+
+
+def check_cycle_summary(stocks: list[Stock]) -> DifferentialResult:
+    """Live analyze_stock from the cycle summary against the full daily history (exact)."""
+    checked = mismatches = 0
+    for stock in stocks:
+        history = StockHistoricalData(stock.history.daily, stock.history.quarterly)
+        live = StockLiveData(price=None, ev_ebit=float(np.nanmedian(history.daily.ev_ebit)))
+        expected = analyze_stock(Stock(stock.info, history, live))
+        history.summary = compute_cycle_summary(history)
+        checked += 1
+        if analyze_stock(Stock(stock.info, history, live)) != expected:
+            mismatches += 1
+    return DifferentialResult("CycleSummary", checked, mismatches, max_error=0.0)
+
+
+def check_parallel(stocks: list[Stock], start_date: date, end_date: date, workers: int) -> DifferentialResult:
+    """Signal inputs computed over a process pool against the serial computation (exact)."""
+    trading_days = BacktestEngine(stocks, start_date, end_date)._get_trading_days()
+    serial = build_signal_matrix(stocks, trading_days)
+    parallel = compute_signal_inputs(stocks, trading_days, [serial.config], workers=workers).signal_matrix(serial.config)
+    checked = mismatches = 0
+    for name in SIGNAL_NAMES:
+        expected, got = getattr(serial, name), getattr(parallel, name)
+        checked += expected.size
+        mismatches += int((expected != got).sum())
+    return DifferentialResult("map_stocks", checked, mismatches, max_error=0.0)
+
+
+def _relative_error(got: float, expected: float) -> float:
+    if got == expected:
+        return 0.0
+    if expected == 0:
+        return math.inf
+    return abs(got - expected) / abs(expected)
@@ -0,0 +1,38 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    scale: int  # tickers in the universe
+    units: int  # work items timed (calls, days or tickers, see `unit`)
+    unit: str
+    seconds: float  # best wall time over the repeats
+    peak_bytes: int | None  # peak traced allocation, None when memory was not measured
+
+    @property
+    def seconds_per_unit(self) -> float:
+        return self.seconds / self.units if self.units else 0.0
+
+
+@dataclass(frozen=True)
+class DifferentialResult:
+    name: str
+    checked: int  # values compared
+    mismatches: int
+    max_error: float  # largest relative error among values compared with a tolerance
+
+    @property
+    def passed(self) -> bool:
+        return self.mismatches == 0
+
+
+@dataclass(frozen=True)
+class ProviderResult:
+    name: str
+    workers: int
+    tickers: int
+    failures: int  # tickers that still failed after the clients' retries
+    seconds: float
+    requests: int  # provider requests, counting each retry
+    retries: int
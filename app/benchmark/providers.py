@@ -0,0 +1,72 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.benchmark.models import ProviderResult
+from app.data.eodhd_client import EODHDClient
+from app.data.historical_data_fetcher import HistoryDataFetcher
+from app.data.ingestion import ingest_histories
+from app.data.live_data_fetcher import LiveDataFetcher
+from app.data.replay import FaultProfile, ProviderArchive, replay_clients
+
+
+def run_provider_benchmarks(
+        tickers: list[str],
+        archive: ProviderArchive,
+        workers: tuple[int, ...] = (1, 4, 8, 16),
+        eodhd_faults: FaultProfile = FaultProfile(),
+        yfinance_faults: FaultProfile = FaultProfile(),
+) -> list[ProviderResult]:
+    """
+    Time ingestion and live fetching of `tickers` against replayed provider responses.
+
+    Every run gets fresh clients, so each one sees the same injected faults.
+    """
+    results = []
+    for count in workers:
+        fetcher = HistoryDataFetcher(*replay_clients(archive, eodhd_faults, yfinance_faults))
+        start = time.perf_counter()
+        ingested = list(ingest_histories(fetcher, tickers, workers=count))
+        results.append(_result(
+            "ingest_histories", count, tickers, start, fetcher.eodhd,
+            failures=sum(result.history is None for result in ingested),
+        ))
+
+        live_fetcher = LiveDataFetcher(*replay_clients(archive, eodhd_faults, yfinance_faults))
+        start = time.perf_counter()
+        live_fetcher.prefetch_prices(tickers)
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            fetched = list(executor.map(lambda ticker: _fetch_live(live_fetcher, ticker), tickers))
+        results.append(_result(
+            "LiveDataFetcher.fetch", count, tickers, start, live_fetcher.eodhd,
+            failures=fetched.count(False),
+        ))
+    return results
+
+
+def _fetch_live(live_fetcher: LiveDataFetcher, ticker: str) -> bool:
+    try:
+        live_fetcher.fetch(ticker)
+    except Exception:
+        return False
+    return True
+
+
+def _result(
+        name: str,
+        workers: int,
+        tickers: list[str],
+        start: float,
+        eodhd: EODHDClient,
+        failures: int,
+) -> ProviderResult:
+    seconds = time.perf_counter() - start
+    stats = eodhd.stats.values()
+    return ProviderResult(
+        name=name,
+        workers=workers,
+        tickers=len(tickers),
+        failures=failures,
+        seconds=seconds,
+        requests=sum(endpoint.requests + endpoint.retries for endpoint in stats),
+        retries=sum(endpoint.retries for endpoint in stats),
+    )
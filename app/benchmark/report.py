@@ -0,0 +1,32 @@
+from app.benchmark.models import BenchmarkResult, DifferentialResult, ProviderResult
+
+
+def print_benchmark_report(results: list[BenchmarkResult]) -> None:
+    print(f"\n{'Benchmark':<28} | {'Tickers':>7} | {'Seconds':>9} | {'Per unit':>15} | {'Peak memory':>11}")
+    print(f"{'-' * 28}-+-{'-' * 7}-+-{'-' * 9}-+-{'-' * 15}-+-{'-' * 11}")
+    for result in results:
+        per_unit = f"{result.seconds_per_unit * 1e6:.1f}us/{result.unit}"
+        peak = "-" if result.peak_bytes is None else f"{result.peak_bytes / 2 ** 20:.1f} MiB"
+        print(f"{result.name:<28} | {result.scale:>7} | {result.seconds:>9.3f} | {per_unit:>15} | {peak:>11}")
+
+
+def print_differential_report(results: list[DifferentialResult]) -> None:
+    print(f"\n{'Differential check':<28} | {'Checked':>9} | {'Mismatches':>10} | {'Max rel err':>11} | Result")
+    print(f"{'-' * 28}-+-{'-' * 9}-+-{'-' * 10}-+-{'-' * 11}-+-{'-' * 6}")
+    for result in results:
+        status = "✅" if result.passed else "❌"
+        print(
+            f"{result.name:<28} | {result.checked:>9} | {result.mismatches:>10} | "
+            f"{result.max_error:>11.1e} | {status}"
+        )
+
+
+def print_provider_report(results: list[ProviderResult]) -> None:
+    print(f"\n{'Replayed path':<28} | {'Workers':>7} | {'Seconds':>9} | {'Failed':>8} | {'EODHD requests':>14} | {'Retries':>7}")
+    print(f"{'-' * 28}-+-{'-' * 7}-+-{'-' * 9}-+-{'-' * 8}-+-{'-' * 14}-+-{'-' * 7}")
+    for result in results:
+        failed = f"{result.failures}/{result.tickers}"
+        print(
+            f"{result.name:<28} | {result.workers:>7} | {result.seconds:>9.3f} | {failed:>8} | "
+            f"{result.requests:>14} | {result.retries:>7}"
+        )
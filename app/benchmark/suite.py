@@ -0,0 +1,127 @@
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from app.backtest.engine import BacktestEngine
+from app.backtest.portfolio import Portfolio
+from app.backtest.simulator import build_price_matrix
+from app.benchmark.models import BenchmarkResult
+from app.core.analyzer import analyze_stock
+from app.core.models import Stock
+from app.core.pit import compute_pit_ev_ebit, compute_pit_ev_ebit_series
+from app.data.historical_data_storage import load_historical_data, save_historical_data
+
+REFERENCE_SAMPLE = 70  # tickers pushed through per-day reference paths at every scale
+
+
+def run_benchmarks(
+        stocks: list[Stock],
+        start_date: date,
+        end_date: date,
+        repeat: int = 1,
+        memory: bool = True,
+        reference_sample: int = REFERENCE_SAMPLE,
+        workers: int = 1,
+) -> list[BenchmarkResult]:
+    """
+    Time (and optionally trace peak memory of) the hot paths over one universe.
+
+    Per-day reference paths that would take hours at scale run on a sample of tickers;
+    compare their `seconds_per_unit` across scales rather than their totals.
+    """
+    scale = len(stocks)
+    sample = sample_stocks(stocks, reference_sample)
+    sample_days = sum(len(stock.history.daily) for stock in sample)
+    all_days = sum(len(stock.history.daily) for stock in stocks)
+
+    def bench(name: str, units: int, unit: str, func: Callable[[], object]) -> BenchmarkResult:
+        return measure(name, scale, units, unit, func, repeat=repeat, memory=memory)
+
+    trading_days = BacktestEngine(stocks, start_date, end_date)._get_trading_days()
+
+    results = [
+        bench("analyze_stock", scale, "call", lambda: [analyze_stock(stock, end_date) for stock in stocks]),
+        bench("compute_pit_ev_ebit", sample_days, "day", lambda: [_reference_pit(stock) for stock in sample]),
+        bench("compute_pit_ev_ebit_series", all_days, "day", lambda: [_vectorized_pit(stock) for stock in stocks]),
+        bench("BacktestEngine.run", len(trading_days), "day", lambda: BacktestEngine(
+            stocks, start_date, end_date, workers=workers,
+        ).run()),
+        bench("Portfolio.rebalance", len(trading_days), "day", lambda: _drive_portfolio(stocks, trading_days)),
+    ]
+
+    with tempfile.TemporaryDirectory(prefix="quant-bench-") as directory:
+        path = Path(directory) / "historical_data"
+        save_historical_data({stock.info.ticker: stock.history for stock in stocks}, path)
+        results.append(bench("load_historical_data", scale, "ticker", lambda: load_historical_data(path=path)))
+
+    return results
+
+
+def measure(
+        name: str,
+        scale: int,
+        units: int,
+        unit: str,
+        func: Callable[[], object],
+        repeat: int = 1,
+        memory: bool = True,
+) -> BenchmarkResult:
+    """Best wall time over `repeat` runs, then one traced run for the peak allocation."""
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    peak_bytes = None
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return BenchmarkResult(name=name, scale=scale, units=units, unit=unit, seconds=seconds, peak_bytes=peak_bytes)
+
+
+def sample_stocks(stocks: list[Stock], size: int) -> list[Stock]:
+    """Up to `size` stocks spread evenly over the universe."""
+    step = max(1, len(stocks) // size)
+    return stocks[::step][:size]
+
+
+def _reference_pit(stock: Stock) -> list[float | None]:
+    records = sorted(stock.history.quarterly.items())
+    daily = stock.history.daily
+    return [
+        compute_pit_ev_ebit(day, float(price), records)
+        for day, price in zip(daily.dates.astype(object), daily.price)
+        if not np.isnan(price)
+    ]
+
+
+def _vectorized_pit(stock: Stock) -> np.ndarray:
+    daily = stock.history.daily
+    return compute_pit_ev_ebit_series(daily.dates, daily.price, sorted(stock.history.quarterly.items()))
+
+
+def _drive_portfolio(stocks: list[Stock], trading_days: list[date]) -> Portfolio:
+    """The per-day Portfolio loop of the reference engine, fed equal targets from a price panel."""
+    tickers = [stock.info.ticker for stock in stocks]
+    prices = build_price_matrix(stocks, trading_days)
+    portfolio = Portfolio()
+    for i, current_date in enumerate(trading_days):
+        day_prices = {
+            ticker: None if np.isnan(price) else float(price)
+            for ticker, price in zip(tickers, prices[i])
+        }
+        # Rotate through halves of the universe so positions actually change
+        targets = set(tickers[i % 2::2])
+        portfolio.rebalance(targets, day_prices, current_date)
+    return portfolio
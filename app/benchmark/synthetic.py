@@ -0,0 +1,122 @@
+from datetime import date
+
+import numpy as np
+
+from app.core.models import (
+    Stock,
+    StockInfo,
+    StockCategory,
+    StockHistoricalData,
+    DailyHistory,
+    QuarterlyHistory,
+)
+from app.core.pit import compute_pit_ev_ebit_series
+
+DEFAULT_END_DATE = date(2025, 6, 30)
+
+
+def generate_universe(
+        n_tickers: int,
+        years: int = 10,
+        seed: int = 0,
+        end_date: date = DEFAULT_END_DATE,
+) -> list[Stock]:
+    """
+    Deterministic synthetic universe of `n_tickers` stocks with up to `years` of daily history.
+
+    Each ticker draws from its own (seed, 0, index) stream, so a ticker's history does not
+    depend on how many others are generated.
+    """
+    categories = list(StockCategory)
+    trading_days = _trading_days(years, seed, end_date)
+    return [
+        Stock(
+            info=StockInfo(f"SYN{i:05d}", categories[i % len(categories)], name=f"Synthetic {i}"),
+            history=generate_history(np.random.default_rng([seed, 0, i]), trading_days),
+        )
+        for i in range(n_tickers)
+    ]
+
+
+def generate_history(rng: np.random.Generator, trading_days: np.ndarray) -> StockHistoricalData:
+    """
+    One stock's history over the market's `trading_days`.
+
+    Realistic rough edges the reference code must handle:
+    - some stocks list part way through the period
+    - random trading halts and the odd missing price
+    - filing lags of 3 weeks to 3 months, occasionally very late (out of order)
+    - unfiled quarters, and missing EBIT or share counts
+    - EBIT that turns negative
+    """
+    # Listing date: a fifth of the universe lists during the period
+    first = int(rng.integers(0, len(trading_days) * 3 // 4)) if rng.random() < 0.2 else 0
+    days = trading_days[first:]
+    days = days[rng.random(len(days)) > 0.005]  # halts
+
+    # Prices: geometric random walk
+    drift = rng.normal(0.0003, 0.0003)
+    volatility = rng.uniform(0.01, 0.035)
+    log_returns = rng.normal(drift, volatility, len(days))
+    price = rng.uniform(5, 300) * np.exp(np.cumsum(log_returns))
+    price[rng.random(len(days)) < 0.001] = np.nan
+
+    quarterly = _generate_quarterly(rng, days[0] if len(days) else trading_days[-1], trading_days[-1])
+    records = sorted(quarterly.items())
+    ev_ebit = compute_pit_ev_ebit_series(days, price, records)
+
+    return StockHistoricalData(
+        daily=DailyHistory(dates=days, price=price, ev_ebit=ev_ebit),
+        quarterly=quarterly,
+    )
+
+
+def _generate_quarterly(rng: np.random.Generator, first_day: np.datetime64, last_day: np.datetime64) -> QuarterlyHistory:
+    # Fundamentals start two years before the first trade, as in a prospectus
+    start_month = first_day.astype("datetime64[M]") - 24
+    start_month -= (start_month.astype(int) % 3) - 2  # end month of that calendar quarter
+    months = np.arange(start_month, last_day.astype("datetime64[M]") + 1, 3)
+    quarters = (months + 1).astype("datetime64[D]") - 1
+    n = len(quarters)
+
+    lag = rng.integers(20, 90, n)
+    late = rng.random(n) < 0.02
+    lag[late] = rng.integers(120, 240, late.sum())
+    filing_date = quarters + lag.astype("timedelta64[D]")
+    filing_date[rng.random(n) < 0.03] = np.datetime64("NaT")
+    filing_date[filing_date > last_day] = np.datetime64("NaT")
+
+    # EBIT: growing trend with seasonality and mean-reverting noise, sometimes negative
+    scale = rng.lognormal(17, 1.5)
+    growth = rng.normal(0.015, 0.02)
+    trend = scale * np.exp(growth * np.arange(n))
+    seasonality = 1 + 0.15 * np.sin(np.arange(n) * np.pi / 2 + rng.uniform(0, 2 * np.pi))
+    noise = np.zeros(n)
+    shocks = rng.normal(0, 0.35, n)
+    for i in range(1, n):
+        noise[i] = 0.6 * noise[i - 1] + shocks[i]
+    ebit = trend * seasonality * (1 + noise) - scale * rng.uniform(0, 0.3)
+    ebit[rng.random(n) < 0.02] = np.nan
+
+    shares = rng.lognormal(19.5, 1.0) * np.cumprod(1 + rng.normal(-0.002, 0.01, n))
+    shares[rng.random(n) < 0.01] = np.nan
+    total_debt = scale * rng.uniform(0, 8) * np.exp(np.cumsum(rng.normal(0, 0.05, n)))
+    cash = scale * rng.uniform(0.5, 4) * np.exp(np.cumsum(rng.normal(0, 0.08, n)))
+
+    return QuarterlyHistory(
+        dates=quarters,
+        filing_date=filing_date,
+        ebit=ebit,
+        total_debt=total_debt,
+        cash=cash,
+        shares_outstanding=shares,
+    )
+
+
+def _trading_days(years: int, seed: int, end_date: date) -> np.ndarray:
+    """Weekdays of the last `years` years minus ~9 market holidays a year shared by every ticker."""
+    end = np.datetime64(end_date, "D") + 1
+    weekdays = np.arange(end - 365 * years - years // 4, end)
+    weekdays = weekdays[np.is_busday(weekdays)]
+    holidays = np.random.default_rng([seed, 1]).random(len(weekdays)) < 9 / 261
+    return weekdays[~holidays]
@@ -0,0 +1,211 @@
+"""
+Command-line entry point: `python -m app <command>`.
+
+Each command imports its implementation only when it runs, so a command that only
+reads cached data never pays for the data clients, pandas or matplotlib.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.core.profiling import print_profile, profile_dir_path, profiling
+
+# Module each command imports, for the `imports` check
+COMMAND_MODULES = {
+    "ingest": "app.script.save_historical_data",
+    "live": "app.script.run_live",
+    "backtest": "app.script.run_backtest",
+    "report": "app.backtest.results",
+}
+IMPORT_BUDGET = 1.0  # seconds a command may spend importing
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    if args.command == "live":
+        _check_live_args(parser, args)
+    if not args.profile:
+        return args.handler(args) or 0
+
+    summary_path, trace_path = args.profile_dir / "profile.json", args.profile_dir / "trace.json"
+    with profiling(summary_path, trace_path, memory=args.profile_memory) as profiler:
+        status = args.handler(args) or 0
+    print_profile(profiler)
+    print(f"\nProfile summary: {summary_path}\nChrome trace: {trace_path}")
+    return status
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="quant", description="Stock valuation screening and backtesting")
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="time phases and hot calls, writing profile.json and trace.json to --profile-dir",
+    )
+    parser.add_argument(
+        "--profile-dir", type=Path, default=profile_dir_path, metavar="DIR",
+        help="where --profile writes its files (default data/profile)",
+    )
+    parser.add_argument("--profile-memory", action="store_true", help="also sample each phase's peak memory")
+    parser.set_defaults(command=None)
+    commands = parser.add_subparsers(title="commands")
+
+    ingest = commands.add_parser("ingest", help="fetch histories into the local store")
+    ingest.add_argument("--full", action="store_true", help="refetch whole histories instead of refreshing")
+    ingest.add_argument("--workers", type=int, default=8)
+    ingest.add_argument("--record", action="store_true", help="also archive provider responses for replay (implies --full)")
+    ingest.add_argument("--shard-size", type=int)
+    ingest.set_defaults(command="ingest", handler=_ingest)
+
+    live = commands.add_parser("live", help="screen the universe on live data")
+    mode = live.add_mutually_exclusive_group()
+    mode.add_argument("--stream", action="store_true", help="fetch concurrently, printing as tickers complete")
+    mode.add_argument("--daemon", action="store_true", help="keep polling and publish analyses as JSON")
+    live.add_argument("--workers", type=int, help="analysis processes, or fundamentals threads with --daemon")
+    live.add_argument("--interval", type=float, help="daemon poll interval in seconds (--daemon only)")
+    live.add_argument("--shard-size", type=int, help="not with --daemon, which keeps the whole universe")
+    live.set_defaults(command="live", handler=_live)
+
+    backtest = commands.add_parser("backtest", help="backtest the strategy on stored history")
+    backtest.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    backtest.add_argument("--shard-size", type=int)
+    backtest.add_argument("--no-plot", action="store_true")
+    backtest.add_argument("--no-cache", action="store_true", help="recompute every signal instead of using the cache")
+    backtest.set_defaults(command="backtest", handler=_backtest)
+
+    report = commands.add_parser("report", help="show the last saved backtest")
+    report.add_argument("--plot", action="store_true")
+    report.set_defaults(command="report", handler=_report)
+
+    imports = commands.add_parser("imports", help="check each command's import time against a budget")
+    imports.add_argument("--budget", type=float, default=IMPORT_BUDGET, help="seconds per command")
+    imports.add_argument("--top", type=int, default=5, help="slowest imports to list per command")
+    imports.set_defaults(command="imports", handler=_imports)
+
+    return parser
+
+
+# =============================================================================
+# Commands
+# =============================================================================
+
+def _ingest(args: argparse.Namespace) -> None:
+    from app.script import save_historical_data
+
+    save_historical_data.main(
+        incremental=not args.full,
+        workers=args.workers,
+        record=args.record,
+        **_shard_size(args),
+    )
+
+
+def _live(args: argparse.Namespace) -> None:
+    if args.daemon:
+        from app.script import run_live_daemon
+
+        options = {"interval": args.interval, "workers": args.workers}
+        run_live_daemon.main(**{name: value for name, value in options.items() if value is not None})
+    elif args.stream:
+        from app.script import run_live_stream
+
+        run_live_stream.main(**_shard_size(args))
+    else:
+        from app.script import run_live
+
+        run_live.main(workers=args.workers or 1, **_shard_size(args))
+
+
+def _check_live_args(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Reject options the chosen live mode would otherwise silently ignore."""
+    if args.interval is not None and not args.daemon:
+        parser.error("live: --interval only applies with --daemon")
+    if args.shard_size is not None and args.daemon:
+        parser.error("live: --shard-size does not apply with --daemon")
+    if args.workers is not None and args.stream:
+        parser.error("live: --workers does not apply with --stream")
+
+
+def _backtest(args: argparse.Namespace) -> None:
+    from app.script import run_backtest
+
+    run_backtest.main(workers=args.workers, plot=not args.no_plot, cache=not args.no_cache, **_shard_size(args))
+
+
+def _report(args: argparse.Namespace) -> int:
+    from app.backtest.report import plot_equity_curve, print_backtest_report
+    from app.backtest.results import backtest_results_path, load_backtest_results
+
+    results = load_backtest_results()
+    if results is None:
+        print(f"No saved backtest at {backtest_results_path}; run `python -m app backtest` first.")
+        return 1
+
+    print(f"Backtest period: {results.start_date} to {results.end_date}")
+    print_backtest_report(results.strategy_metrics, results.benchmark_metrics)
+    if args.plot:
+        plot_equity_curve(results.strategy_snapshots, results.benchmark_snapshots)
+    return 0
+
+
+def _imports(args: argparse.Namespace) -> int:
+    over_budget = []
+    for command, module in COMMAND_MODULES.items():
+        total, slowest = measure_import_time(module)
+        status = "✅" if total <= args.budget else "❌"
+        print(f"{status} {command:<9} {module:<36} {total:6.2f}s")
+        for seconds, name in slowest[:args.top]:
+            print(f"      {seconds:6.3f}s  {name}")
+        if total > args.budget:
+            over_budget.append(command)
+
+    if over_budget:
+        print(f"\nOver the {args.budget:g}s import budget: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+def measure_import_time(module: str) -> tuple[float, list[tuple[float, str]]]:
+    """
+    Cumulative seconds to import `module` in a fresh interpreter, and the slowest
+    top-level packages it pulls in (cumulative seconds, name), slowest first.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # "import time: self [us] | cumulative | imported package"; nesting is shown by
+    # indentation, and a module's imports are listed before it
+    tree: list[tuple[float, str]] = []
+    total = 0.0
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if not name.startswith("  "):  # top level: interpreter startup, or `module` itself
+            if name.strip() == module:
+                total = int(cumulative) / 1e6
+                break
+            tree.clear()
+            continue
+        tree.append((int(cumulative) / 1e6, name.strip()))
+
+    # A package's outermost import has the largest cumulative time of all its modules
+    packages: dict[str, float] = {}
+    for seconds, name in tree:
+        root = name.split(".")[0]
+        if root != module.split(".")[0]:
+            packages[root] = max(packages.get(root, 0.0), seconds)
+    slowest = sorted(((seconds, name) for name, seconds in packages.items()), reverse=True)
+    return total, slowest
+
+
+def _shard_size(args: argparse.Namespace) -> dict[str, int]:
+    return {} if args.shard_size is None else {"shard_size": args.shard_size}
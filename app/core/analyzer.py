@@ -1,18 +1,19 @@
 from datetime import date, timedelta
 
-from app.core.metrics import (
-    calc_ebit_ttm,
-    calc_ev_ebit_percentile,
-    calc_ebit_growth,
-)
-from app.core.models import Stock, StockMetrics, StockSignals, StockAnalysis
+import numpy as np
+
+from app.core.metrics import calc_ev_ebit_percentile
+from app.core.models import Stock, StockMetrics, StockSignals, StockAnalysis, CycleSummary
+from app.core.profiling import traced
 from app.core.signals import (
     signal_ev_ebit_cycle,
     signal_ebit_positive,
     signal_ebit_growth_positive,
 )
+from app.core.summary import calc_ebit_figures
 
 
+@traced("analyze_stock")
 def analyze_stock(stock: Stock, target_date: date | None = None) -> StockAnalysis:
     try:
         metrics = _calculate_metrics(stock, target_date)
@@ -40,58 +41,37 @@ def analyze_stock(stock: Stock, target_date: date | None = None) -> StockAnalysi
 def _calculate_metrics(stock: Stock, target_date: date | None = None) -> StockMetrics:
     analysis_date = target_date if target_date else date.today()
 
-    sorted_daily_dates = sorted(
-        (day for day in stock.history.daily.keys() if day <= analysis_date),
-        reverse=True,
-    )
-    filed_quarters = sorted(
-        (
-            quarter for quarter, data in stock.history.quarterly.items()
-            if data.filing_date is not None and data.filing_date <= analysis_date
-        ),
-        reverse=True,
-    )
+    summary = stock.history.summary
+    if target_date is None and summary is not None and summary.as_of <= analysis_date:
+        return _calculate_live_metrics(stock, summary, analysis_date)
+
+    daily = stock.history.daily.between(end=analysis_date)
 
     # EV/EBIT (current)
     if target_date is None:
         assert stock.live
         current_ev_ebit = stock.live.ev_ebit
     else:
-        if not sorted_daily_dates:
+        if len(daily) == 0 or np.isnan(daily.ev_ebit[-1]):
             current_ev_ebit = None
         else:
-            current_ev_ebit = stock.history.daily[sorted_daily_dates[0]].ev_ebit
+            current_ev_ebit = float(daily.ev_ebit[-1])
 
     # EV/EBIT (historical cycle)
-    daily_ev_ebit: dict[date, float] = {}
-    for day in sorted_daily_dates:
-        stock_daily_data = stock.history.daily[day]
-        if stock_daily_data.ev_ebit is not None and stock_daily_data.ev_ebit > 0:
-            daily_ev_ebit[day] = stock_daily_data.ev_ebit
-
-    def calc_ev_ebit_cycle(
-            ev_ebit_data: dict[date, float],
-            years: int,
-            end_date: date,
-    ) -> tuple[float | None, int]:
-        date_ago = end_date - timedelta(days=365 * years)
-        values = [value for day, value in ev_ebit_data.items() if day >= date_ago]
+    positive = daily.ev_ebit > 0
+    daily_ev_ebit_dates = daily.dates[positive]
+    daily_ev_ebit = daily.ev_ebit[positive]
+
+    def calc_ev_ebit_cycle(years: int, end_date: date) -> tuple[float | None, int]:
+        date_ago = np.datetime64(end_date - timedelta(days=365 * years), "D")
+        values = daily_ev_ebit[np.searchsorted(daily_ev_ebit_dates, date_ago):]
         return calc_ev_ebit_percentile(values, 25), len(values)
 
-    ev_ebit_q1_5y, ev_ebit_days_5y = calc_ev_ebit_cycle(daily_ev_ebit, 5, analysis_date)
-    ev_ebit_q1_1y, ev_ebit_days_1y = calc_ev_ebit_cycle(daily_ev_ebit, 1, analysis_date)
+    ev_ebit_q1_5y, ev_ebit_days_5y = calc_ev_ebit_cycle(5, analysis_date)
+    ev_ebit_q1_1y, ev_ebit_days_1y = calc_ev_ebit_cycle(1, analysis_date)
 
     # EBIT TTM & EBIT YoY Growth
-    ebit_ttm_current = None
-    if len(filed_quarters) >= 4:
-        current_quarters = [stock.history.quarterly[quarter] for quarter in filed_quarters[:4]]
-        ebit_ttm_current = calc_ebit_ttm([quarter.ebit for quarter in current_quarters])
-
-    ebit_growth = None
-    if len(filed_quarters) >= 8:
-        prior_quarters = [stock.history.quarterly[quarter] for quarter in filed_quarters[4:8]]
-        ebit_ttm_prior = calc_ebit_ttm([quarter.ebit for quarter in prior_quarters])
-        ebit_growth = calc_ebit_growth(ebit_ttm_current, ebit_ttm_prior)
+    _, ebit_ttm_current, ebit_growth = calc_ebit_figures(stock.history.quarterly, analysis_date)
 
     return StockMetrics(
         ev_ebit=current_ev_ebit,
@@ -102,3 +82,31 @@ def _calculate_metrics(stock: Stock, target_date: date | None = None) -> StockMe
         ebit_ttm=ebit_ttm_current,
         ebit_growth=ebit_growth,
     )
+
+
+def _calculate_live_metrics(stock: Stock, summary: CycleSummary, analysis_date: date) -> StockMetrics:
+    """Combine the live EV/EBIT with the ingested cycle summary instead of scanning the daily history."""
+    assert stock.live
+
+    def calc_ev_ebit_cycle(years: int) -> tuple[float | None, int]:
+        values = summary.ev_ebit_since(analysis_date - timedelta(days=365 * years))
+        return calc_ev_ebit_percentile(values, 25), len(values)
+
+    ev_ebit_q1_5y, ev_ebit_days_5y = calc_ev_ebit_cycle(5)
+    ev_ebit_q1_1y, ev_ebit_days_1y = calc_ev_ebit_cycle(1)
+
+    # A quarter filed since ingestion changes the EBIT figures; the quarterly history is small
+    if summary.ebit_current(analysis_date):
+        ebit_ttm_current, ebit_growth = summary.ebit_ttm, summary.ebit_growth
+    else:
+        _, ebit_ttm_current, ebit_growth = calc_ebit_figures(stock.history.quarterly, analysis_date)
+
+    return StockMetrics(
+        ev_ebit=stock.live.ev_ebit,
+        ev_ebit_q1_5y=ev_ebit_q1_5y,
+        ev_ebit_q1_1y=ev_ebit_q1_1y,
+        ev_ebit_days_5y=ev_ebit_days_5y,
+        ev_ebit_days_1y=ev_ebit_days_1y,
+        ebit_ttm=ebit_ttm_current,
+        ebit_growth=ebit_growth,
+    )
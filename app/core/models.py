@@ -1,7 +1,10 @@
+from collections.abc import Iterator, Mapping
 from dataclasses import dataclass
 from datetime import date
 from enum import Enum
 
+import numpy as np
+
 
 # ============================================================================
 # Stock Data Classes
@@ -45,10 +48,173 @@ class StockQuarterlyData:
     shares_outstanding: float | None
 
 
+class DailyHistory(Mapping[date, StockDailyData]):
+    """
+    Columnar daily history: sorted datetime64 dates with aligned float64 columns (NaN stands for None).
+
+    Also behaves as a read-only `dict[date, StockDailyData]` for dict-style callers.
+    """
+
+    def __init__(self, dates: np.ndarray, price: np.ndarray, ev_ebit: np.ndarray):
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.price = np.asarray(price, dtype=np.float64)
+        self.ev_ebit = np.asarray(ev_ebit, dtype=np.float64)
+
+    @classmethod
+    def from_dict(cls, daily: Mapping[date, StockDailyData]) -> "DailyHistory":
+        days = sorted(daily)
+        return cls(
+            dates=np.array(days, dtype="datetime64[D]"),
+            price=_to_column(daily[day].price for day in days),
+            ev_ebit=_to_column(daily[day].ev_ebit for day in days),
+        )
+
+    def index_of(self, day: date) -> int:
+        """Index of `day`, or -1 if it is not in the history."""
+        i = int(np.searchsorted(self.dates, np.datetime64(day, "D")))
+        if i < len(self.dates) and self.dates[i] == np.datetime64(day, "D"):
+            return i
+        return -1
+
+    def asof_index(self, day: date) -> int:
+        """Index of the latest day on or before `day`, or -1 if there is none."""
+        return int(np.searchsorted(self.dates, np.datetime64(day, "D"), side="right")) - 1
+
+    def asof(self, day: date) -> StockDailyData | None:
+        i = self.asof_index(day)
+        return self._record(i) if i >= 0 else None
+
+    def between(self, start: date | None = None, end: date | None = None) -> "DailyHistory":
+        """View of the days in [start, end] (either bound may be open)."""
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(start, "D")))
+        hi = len(self.dates) if end is None else self.asof_index(end) + 1
+        return DailyHistory(self.dates[lo:hi], self.price[lo:hi], self.ev_ebit[lo:hi])
+
+    def _record(self, i: int) -> StockDailyData:
+        return StockDailyData(price=_from_column(self.price[i]), ev_ebit=_from_column(self.ev_ebit[i]))
+
+    def __getitem__(self, day: date) -> StockDailyData:
+        i = self.index_of(day)
+        if i < 0:
+            raise KeyError(day)
+        return self._record(i)
+
+    def __iter__(self) -> Iterator[date]:
+        return iter(self.dates.astype(object).tolist())
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+
+class QuarterlyHistory(Mapping[date, StockQuarterlyData]):
+    """
+    Columnar quarterly history keyed by sorted quarter-end dates (NaT/NaN stand for None).
+
+    Also behaves as a read-only `dict[date, StockQuarterlyData]` for dict-style callers.
+    """
+
+    def __init__(
+            self,
+            dates: np.ndarray,
+            filing_date: np.ndarray,
+            ebit: np.ndarray,
+            total_debt: np.ndarray,
+            cash: np.ndarray,
+            shares_outstanding: np.ndarray,
+    ):
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.filing_date = np.asarray(filing_date, dtype="datetime64[D]")
+        self.ebit = np.asarray(ebit, dtype=np.float64)
+        self.total_debt = np.asarray(total_debt, dtype=np.float64)
+        self.cash = np.asarray(cash, dtype=np.float64)
+        self.shares_outstanding = np.asarray(shares_outstanding, dtype=np.float64)
+
+    @classmethod
+    def from_dict(cls, quarterly: Mapping[date, StockQuarterlyData]) -> "QuarterlyHistory":
+        quarters = sorted(quarterly)
+        records = [quarterly[quarter] for quarter in quarters]
+        return cls(
+            dates=np.array(quarters, dtype="datetime64[D]"),
+            filing_date=np.array(
+                [np.datetime64("NaT") if r.filing_date is None else r.filing_date for r in records],
+                dtype="datetime64[D]",
+            ),
+            ebit=_to_column(r.ebit for r in records),
+            total_debt=_to_column(r.total_debt for r in records),
+            cash=_to_column(r.cash for r in records),
+            shares_outstanding=_to_column(r.shares_outstanding for r in records),
+        )
+
+    def filed_mask(self, day: date) -> np.ndarray:
+        """Quarters whose filing date is on or before `day` (unfiled quarters never are)."""
+        return self.filing_date <= np.datetime64(day, "D")
+
+    def _record(self, i: int) -> StockQuarterlyData:
+        filing_date = self.filing_date[i]
+        return StockQuarterlyData(
+            filing_date=None if np.isnat(filing_date) else filing_date.astype(object),
+            ebit=_from_column(self.ebit[i]),
+            total_debt=_from_column(self.total_debt[i]),
+            cash=_from_column(self.cash[i]),
+            shares_outstanding=_from_column(self.shares_outstanding[i]),
+        )
+
+    def __getitem__(self, quarter: date) -> StockQuarterlyData:
+        i = int(np.searchsorted(self.dates, np.datetime64(quarter, "D")))
+        if i >= len(self.dates) or self.dates[i] != np.datetime64(quarter, "D"):
+            raise KeyError(quarter)
+        return self._record(i)
+
+    def __iter__(self) -> Iterator[date]:
+        return iter(self.dates.astype(object).tolist())
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+
+@dataclass
+class CycleSummary:
+    """
+    What live analysis needs from a stock's history, as of its last stored day `as_of`.
+
+    `ev_ebit_dates`/`ev_ebit` are the positive EV/EBIT days of the longest cycle window
+    ending at `as_of`, so the window of any later day is a suffix of them. The EBIT
+    figures hold until the next filing after `as_of` (`valid_until`; None if none is due).
+    """
+    as_of: date
+    ev_ebit_dates: np.ndarray
+    ev_ebit: np.ndarray
+    ebits: list[float | None]  # latest eight filed quarterly EBITs, newest first
+    ebit_ttm: float | None
+    ebit_growth: float | None
+    valid_until: date | None = None
+
+    def ev_ebit_since(self, day: date) -> np.ndarray:
+        """Positive EV/EBIT values from `day` through `as_of`."""
+        return self.ev_ebit[np.searchsorted(self.ev_ebit_dates, np.datetime64(day, "D")):]
+
+    def ebit_current(self, day: date) -> bool:
+        """Whether the EBIT figures are still those of `day` (no filing since `as_of`)."""
+        return self.as_of <= day and (self.valid_until is None or day < self.valid_until)
+
+
 @dataclass
 class StockHistoricalData:
-    daily: dict[date, StockDailyData]
-    quarterly: dict[date, StockQuarterlyData]
+    daily: DailyHistory
+    quarterly: QuarterlyHistory
+    name: str | None = None  # company name, stored so live runs need not look it up
+    summary: CycleSummary | None = None  # precomputed at ingestion for live analysis
+
+    def __post_init__(self):
+        if not isinstance(self.daily, DailyHistory):
+            self.daily = DailyHistory.from_dict(self.daily)
+        if not isinstance(self.quarterly, QuarterlyHistory):
+            self.quarterly = QuarterlyHistory.from_dict(self.quarterly)
+
+    def __setstate__(self, state: dict) -> None:
+        # Pickles written before the columnar layout hold plain dicts
+        self.__dict__.update(state)
+        self.__post_init__()
 
 
 @dataclass
@@ -105,3 +271,15 @@ class StockAnalysis:
     metrics: StockMetrics
     signals: StockSignals
     error: str | None = None
+
+
+# ============================================================================
+# Column Helpers
+# ============================================================================
+
+def _to_column(values) -> np.ndarray:
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+
+def _from_column(value: np.floating) -> float | None:
+    return None if np.isnan(value) else float(value)
@@ -0,0 +1,157 @@
+import math
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, TypeVar
+
+import numpy as np
+
+from app.core.models import (
+    Stock,
+    StockInfo,
+    StockLiveData,
+    StockHistoricalData,
+    DailyHistory,
+    QuarterlyHistory,
+    CycleSummary,
+)
+from app.core import profiling
+
+T = TypeVar("T")
+
+_DAILY_COLUMNS = {"dates": "datetime64[D]", "price": "float64", "ev_ebit": "float64"}
+_QUARTERLY_COLUMNS = {
+    "dates": "datetime64[D]",
+    "filing_date": "datetime64[D]",
+    "ebit": "float64",
+    "total_debt": "float64",
+    "cash": "float64",
+    "shares_outstanding": "float64",
+}
+
+ColumnLayout = dict[str, tuple[int, int]]  # "daily.price" -> (offset, length)
+
+
+class SharedHistories:
+    """
+    Columns of many stocks' histories packed into one memory-mapped file.
+
+    Worker processes map the file read-only, so history crosses the process
+    boundary once through the page cache instead of being pickled per task.
+    """
+
+    def __init__(self, histories: list[StockHistoricalData]):
+        self._directory = tempfile.TemporaryDirectory(prefix="quant-")
+        self.path = Path(self._directory.name) / "histories.npy"
+        self.layout: list[ColumnLayout] = []
+
+        columns: list[np.ndarray] = []
+        offset = 0
+        for history in histories:
+            entry: ColumnLayout = {}
+            for prefix, table, names in (
+                    ("daily", history.daily, _DAILY_COLUMNS),
+                    ("quarterly", history.quarterly, _QUARTERLY_COLUMNS),
+            ):
+                for name in names:
+                    column = getattr(table, name)
+                    entry[f"{prefix}.{name}"] = (offset, len(column))
+                    columns.append(column.view(np.int64))
+                    offset += len(column)
+            self.layout.append(entry)
+
+        np.save(self.path, np.concatenate(columns) if columns else np.empty(0, dtype=np.int64))
+
+    def close(self) -> None:
+        self._directory.cleanup()
+
+    def __enter__(self) -> "SharedHistories":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def load_shared_histories(path: Path, layout: list[ColumnLayout]) -> list[StockHistoricalData]:
+    """Zero-copy histories backed by the memory-mapped file of a `SharedHistories`."""
+    packed = np.load(path, mmap_mode="r")
+
+    def column(entry: ColumnLayout, key: str, dtype: str) -> np.ndarray:
+        offset, length = entry[key]
+        return packed[offset:offset + length].view(dtype)
+
+    return [
+        StockHistoricalData(
+            daily=DailyHistory(**{
+                name: column(entry, f"daily.{name}", dtype) for name, dtype in _DAILY_COLUMNS.items()
+            }),
+            quarterly=QuarterlyHistory(**{
+                name: column(entry, f"quarterly.{name}", dtype) for name, dtype in _QUARTERLY_COLUMNS.items()
+            }),
+        )
+        for entry in layout
+    ]
+
+
+def map_stocks(
+        func: Callable[..., T],
+        stocks: list[Stock],
+        *args: Any,
+        workers: int = 1,
+) -> list[T]:
+    """
+    Compute `func(stock, *args)` for every stock, spread over `workers` processes.
+
+    `func` must be a module-level function. Results are returned in `stocks` order.
+    """
+    if workers <= 1 or len(stocks) <= 1:
+        return [func(stock, *args) for stock in stocks]
+
+    profiling.count("map_stocks.stocks", len(stocks))
+
+    # Cycle summaries are small, so they travel with the tasks rather than the shared file
+    tasks = [(i, stock.info, stock.live, stock.history.summary) for i, stock in enumerate(stocks)]
+    chunk_size = math.ceil(len(tasks) / (workers * 4))
+    chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+
+    results: list[T | None] = [None] * len(stocks)
+    with profiling.span("map_stocks"), SharedHistories([stock.history for stock in stocks]) as shared:
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(shared.path, shared.layout, func, args),
+        ) as executor:
+            for chunk_results in executor.map(_run_chunk, chunks):
+                for i, result in chunk_results:
+                    results[i] = result
+    return results
+
+
+# =============================================================================
+# Worker Process
+# =============================================================================
+
+_worker_histories: list[StockHistoricalData] = []
+_worker_func: Callable[..., Any] | None = None
+_worker_args: tuple[Any, ...] = ()
+
+
+def _init_worker(path: Path, layout: list[ColumnLayout], func: Callable[..., Any], args: tuple[Any, ...]) -> None:
+    global _worker_histories, _worker_func, _worker_args
+    profiling.disable()  # a forked worker inherits the parent's profiler
+    _worker_histories = load_shared_histories(path, layout)
+    _worker_func = func
+    _worker_args = args
+
+
+def _run_chunk(
+        chunk: list[tuple[int, StockInfo, StockLiveData | None, CycleSummary | None]],
+) -> list[tuple[int, Any]]:
+    assert _worker_func is not None
+    results = []
+    for i, info, live, summary in chunk:
+        history = replace(_worker_histories[i], summary=summary)
+        results.append((i, _worker_func(Stock(info=info, history=history, live=live), *_worker_args)))
+    return results
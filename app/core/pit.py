@@ -1,8 +1,10 @@
 from datetime import date
 from itertools import pairwise
 
+import numpy as np
+
 from app.core.metrics import calc_ebit_ttm, calc_ev, calc_ev_ebit
-from app.core.models import StockQuarterlyData
+from app.core.models import QuarterlyHistory, StockQuarterlyData
 
 
 def compute_pit_ev_ebit(
@@ -31,3 +33,79 @@ def compute_pit_ev_ebit(
     market_cap = price * latest_quarter.shares_outstanding
     ev = calc_ev(market_cap, latest_quarter.total_debt, latest_quarter.cash)
     return calc_ev_ebit(ev, ebit_ttm)
+
+
+def compute_pit_ev_ebit_series(
+        days: np.ndarray,
+        prices: np.ndarray,
+        quarterly_records: list[tuple[date, StockQuarterlyData]],
+) -> np.ndarray:
+    """Vectorized `compute_pit_ev_ebit` over a whole price series (NaN stands for None)."""
+    assert all(a[0] <= b[0] for a, b in pairwise(quarterly_records))
+
+    days = np.asarray(days, dtype="datetime64[D]")
+    prices = np.asarray(prices, dtype=np.float64)
+    quarterly = QuarterlyHistory.from_dict(dict(quarterly_records))
+
+    if len(quarterly) < 4:
+        return np.full(len(days), np.nan)
+
+    # Latest filed quarter per day: the last quarter filed by `day` is the last index whose
+    # suffix-minimum filing date is on or before `day` (unfiled quarters never count).
+    filing_dates = np.where(np.isnat(quarterly.filing_date), np.datetime64("9999-12-31"), quarterly.filing_date)
+    earliest_later_filing = np.minimum.accumulate(filing_dates[::-1])[::-1]
+    latest_idx = np.searchsorted(earliest_later_filing, days, side="right") - 1
+
+    # EBIT TTM once per quarter
+    ebit = quarterly.ebit
+    ebit_ttm = np.full(len(ebit), np.nan)
+    ebit_ttm[3:] = _sum_like_builtin([ebit[3:], ebit[2:-1], ebit[1:-2], ebit[:-3]])
+
+    has_ttm = latest_idx >= 3
+    quarter_idx = np.where(has_ttm, latest_idx, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        market_cap = prices * quarterly.shares_outstanding[quarter_idx]
+        ev = market_cap + quarterly.total_debt[quarter_idx] - quarterly.cash[quarter_idx]
+        ttm = ebit_ttm[quarter_idx]
+        return np.where(has_ttm & (ev > 0) & (ttm > 0), ev / ttm, np.nan)
+
+
+def first_affected_day(old: QuarterlyHistory, new: QuarterlyHistory) -> date | None:
+    """
+    Earliest day whose PIT EV/EBIT can differ between two versions of a quarterly history.
+
+    A day only sees quarters filed by then, so a revision or a new quarter can only affect
+    days from the earliest filing of any quarter at or after the first differing one.
+    Returns None when no day is affected.
+    """
+    quarters = sorted(set(old) | set(new))
+    changed = next((quarter for quarter in quarters if old.get(quarter) != new.get(quarter)), None)
+    if changed is None:
+        return None
+
+    changed_day = np.datetime64(changed, "D")
+    filing_dates = np.concatenate((
+        old.filing_date[old.dates >= changed_day],
+        new.filing_date[new.dates >= changed_day],
+    ))
+    filing_dates = filing_dates[~np.isnat(filing_dates)]
+    if len(filing_dates) == 0:
+        return None
+    return filing_dates.min().astype(object)
+
+
+def _sum_like_builtin(terms: list[np.ndarray]) -> np.ndarray:
+    """
+    Element-wise `sum(terms)` that is bit-identical to the builtin used by calc_ebit_ttm.
+
+    Since Python 3.12 the builtin sums floats with Neumaier compensation, so the
+    compensation term is replicated here instead of adding the columns naively.
+    """
+    total = 0.0 + terms[0]
+    compensation = np.zeros_like(total)
+    with np.errstate(invalid="ignore"):
+        for term in terms[1:]:
+            t = total + term
+            compensation += np.where(np.abs(total) >= np.abs(term), (total - t) + term, (term - t) + total)
+            total = t
+        return np.where((compensation != 0) & np.isfinite(compensation), total + compensation, total)
@@ -0,0 +1,322 @@
+"""
+Opt-in timers, counters and per-phase peak memory for ingest, analysis and backtest runs.
+
+Instrumented code calls `span`, `phase` and `count` (or is decorated with `traced`)
+unconditionally. Until `enable` is called each hook is a global lookup returning a shared
+no-op, so the hooks stay in production code. Only the enabling process is profiled: work
+in `map_stocks` worker processes shows up as the span around the pool.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, ContextManager, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+profile_dir_path = Path(__file__).parent.parent.parent.resolve() / "data" / "profile"
+
+MAX_TRACE_EVENTS = 1_000_000  # spans kept for the Chrome trace; later ones are only aggregated
+
+
+@dataclass
+class SpanStats:
+    calls: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+@dataclass
+class PhaseStats:
+    calls: int = 0
+    total_seconds: float = 0.0
+    peak_bytes: int | None = None  # highest traced allocation while the phase ran, None without memory
+
+
+class Profiler:
+    """
+    Collects span timings (aggregated per name, and as trace events), counters and phase peaks.
+
+    Phases are coarse spans (loading, signals, simulation, ...) that also sample peak memory
+    through tracemalloc when `memory` is set; nested phases each get their own peak.
+    Spans may be recorded from any thread; phases are meant for the main thread.
+    """
+
+    def __init__(self, memory: bool = False, trace: bool = True, max_events: int = MAX_TRACE_EVENTS):
+        self.memory = memory
+        self.trace = trace
+        self.max_events = max_events
+        self.spans: dict[str, SpanStats] = {}
+        self.phases: dict[str, PhaseStats] = {}
+        self.counters: Counter[str] = Counter()
+        # (name, category, start ns, duration ns, thread id), relative to `_origin`
+        self.events: list[tuple[str, str, int, int, int]] = []
+        self.dropped_events = 0
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+        self._open_peaks: list[int] = []  # running peak of each open phase, innermost last
+        self._owns_tracemalloc = False
+
+    def start(self) -> None:
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+
+    def stop(self) -> None:
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    def span(self, name: str) -> "_Span":
+        return _Span(self, name)
+
+    def phase(self, name: str) -> "_Phase":
+        return _Phase(self, name)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def record(self, name: str, start_ns: int, end_ns: int) -> None:
+        seconds = (end_ns - start_ns) / 1e9
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = SpanStats()
+            stats.calls += 1
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            self._add_event(name, "span", start_ns, end_ns)
+
+    def _add_event(self, name: str, category: str, start_ns: int, end_ns: int) -> None:
+        # Called with the lock held
+        if not self.trace:
+            return
+        if len(self.events) < self.max_events:
+            self.events.append((name, category, start_ns - self._origin, end_ns - start_ns, threading.get_ident()))
+        else:
+            self.dropped_events += 1
+
+    # =========================================================================
+    # Export
+    # =========================================================================
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "phases": {name: asdict(stats) for name, stats in self.phases.items()},
+                "spans": {
+                    name: asdict(stats) | {"mean_seconds": stats.mean_seconds}
+                    for name, stats in sorted(self.spans.items(), key=lambda item: -item[1].total_seconds)
+                },
+                "counters": dict(sorted(self.counters.items())),
+                "dropped_events": self.dropped_events,
+            }
+
+    def write_summary(self, path: Path) -> None:
+        _write_json(path, self.summary())
+
+    def write_chrome_trace(self, path: Path) -> None:
+        """Trace Event Format JSON, for chrome://tracing or Perfetto."""
+        pid = os.getpid()
+        with self._lock:
+            trace_events = [
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": start_ns / 1e3,
+                    "dur": duration_ns / 1e3,
+                    "pid": pid,
+                    "tid": tid,
+                }
+                for name, category, start_ns, duration_ns, tid in self.events
+            ]
+            end_us = (time.perf_counter_ns() - self._origin) / 1e3
+            if self.counters:
+                trace_events.append(
+                    {"name": "counters", "ph": "C", "ts": end_us, "pid": pid, "args": dict(self.counters)}
+                )
+        _write_json(path, {"traceEvents": trace_events, "displayTimeUnit": "ms"})
+
+    # =========================================================================
+    # Phase Memory
+    # =========================================================================
+
+    def _enter_phase(self) -> None:
+        if not self.memory:
+            return
+        # The enclosing phase keeps the peak reached so far; the new phase measures from here
+        if self._open_peaks:
+            self._open_peaks[-1] = max(self._open_peaks[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        self._open_peaks.append(tracemalloc.get_traced_memory()[0])
+
+    def _exit_phase(self, name: str, start_ns: int, end_ns: int) -> None:
+        peak = None
+        if self.memory:
+            peak = max(self._open_peaks.pop(), tracemalloc.get_traced_memory()[1])
+            if self._open_peaks:
+                self._open_peaks[-1] = max(self._open_peaks[-1], peak)
+        with self._lock:
+            stats = self.phases.get(name)
+            if stats is None:
+                stats = self.phases[name] = PhaseStats()
+            stats.calls += 1
+            stats.total_seconds += (end_ns - start_ns) / 1e9
+            if peak is not None:
+                stats.peak_bytes = max(stats.peak_bytes or 0, peak)
+            self._add_event(name, "phase", start_ns, end_ns)
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "start_ns")
+
+    def __init__(self, profiler: Profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start_ns = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler.record(self.name, self.start_ns, time.perf_counter_ns())
+
+
+class _Phase(_Span):
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        self.profiler._enter_phase()
+        self.start_ns = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler._exit_phase(self.name, self.start_ns, time.perf_counter_ns())
+
+
+# =============================================================================
+# Hooks
+# =============================================================================
+
+_profiler: Profiler | None = None
+_DISABLED = nullcontext()
+
+
+def enable(memory: bool = False, trace: bool = True) -> Profiler:
+    """Start profiling this process, replacing any active profiler."""
+    global _profiler
+    disable()
+    profiler = Profiler(memory=memory, trace=trace)
+    profiler.start()
+    _profiler = profiler
+    return profiler
+
+
+def disable() -> Profiler | None:
+    """Stop profiling and return the profiler that was active, if any."""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def active_profiler() -> Profiler | None:
+    return _profiler
+
+
+def span(name: str) -> ContextManager[None]:
+    """Time the enclosed block under `name`."""
+    profiler = _profiler
+    return _DISABLED if profiler is None else _Span(profiler, name)
+
+
+def phase(name: str) -> ContextManager[None]:
+    """Time the enclosed block under `name` and sample its peak memory."""
+    profiler = _profiler
+    return _DISABLED if profiler is None else _Phase(profiler, name)
+
+
+def count(name: str, n: int = 1) -> None:
+    profiler = _profiler
+    if profiler is not None:
+        profiler.count(name, n)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator timing every call of the function under `name`."""
+
+    def decorate(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if profiler is None:
+                return func(*args, **kwargs)
+            start_ns = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record(name, start_ns, time.perf_counter_ns())
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+@contextmanager
+def profiling(
+        summary_path: Path | None = None,
+        trace_path: Path | None = None,
+        memory: bool = False,
+) -> Iterator[Profiler]:
+    """Profile the enclosed block, then write the JSON summary and Chrome trace (when paths are given)."""
+    profiler = enable(memory=memory, trace=trace_path is not None)
+    try:
+        yield profiler
+    finally:
+        disable()
+        if summary_path is not None:
+            profiler.write_summary(summary_path)
+        if trace_path is not None:
+            profiler.write_chrome_trace(trace_path)
+
+
+def print_profile(profiler: Profiler, top: int = 15) -> None:
+    summary = profiler.summary()
+    if summary["phases"]:
+        print(f"\n{'Phase':<36} {'Calls':>7} {'Total':>10} {'Peak MiB':>10}")
+        for name, stats in summary["phases"].items():
+            peak = "-" if stats["peak_bytes"] is None else f"{stats['peak_bytes'] / 2 ** 20:.1f}"
+            print(f"{name:<36} {stats['calls']:>7} {stats['total_seconds']:>9.3f}s {peak:>10}")
+
+    spans = list(summary["spans"].items())[:top]
+    if spans:
+        print(f"\n{'Span':<36} {'Calls':>9} {'Total':>10} {'Mean':>11} {'Max':>10}")
+        for name, stats in spans:
+            print(
+                f"{name:<36} {stats['calls']:>9} {stats['total_seconds']:>9.3f}s "
+                f"{stats['mean_seconds'] * 1e3:>9.3f}ms {stats['max_seconds']:>9.3f}s"
+            )
+
+    if summary["counters"]:
+        print(f"\n{'Counter':<36} {'Value':>12}")
+        for name, value in summary["counters"].items():
+            print(f"{name:<36} {value:>12}")
+
+
+def _write_json(path: Path, document: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    temp_path.write_text(json.dumps(document), encoding="utf-8")
+    os.replace(temp_path, path)
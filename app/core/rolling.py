@@ -0,0 +1,56 @@
+import math
+from bisect import bisect_left, insort
+from collections import deque
+from datetime import date, timedelta
+
+
+class RollingQuantile:
+    """
+    Trailing calendar window of values, kept sorted for order-statistic queries.
+
+    Values are pushed in day order; entries older than `days` calendar days before the
+    latest pushed (or advanced-to) day are evicted. Insert and evict locate their slot
+    with a binary search, and `percentile` reads two order statistics directly.
+    """
+
+    def __init__(self, days: int):
+        self.days = days
+        self._entries: deque[tuple[date, float]] = deque()
+        self._sorted: list[float] = []
+
+    def push(self, day: date, value: float) -> None:
+        self._entries.append((day, value))
+        insort(self._sorted, value)
+        self.advance(day)
+
+    def advance(self, day: date) -> None:
+        """Move the window end to `day`, evicting entries before `day - days`."""
+        window_start = day - timedelta(days=self.days)
+        while self._entries and self._entries[0][0] < window_start:
+            _, value = self._entries.popleft()
+            del self._sorted[bisect_left(self._sorted, value)]
+
+    def percentile(self, percentile: float) -> float | None:
+        """
+        p-th percentile of the window, identical to `np.percentile(values, p)` (linear method).
+        """
+        n = len(self._sorted)
+        if n == 0:
+            return None
+        virtual_index = (n - 1) * (percentile / 100)
+        if virtual_index >= n - 1:
+            return self._sorted[-1]
+
+        previous_index = math.floor(virtual_index)
+        gamma = virtual_index - previous_index
+        previous = self._sorted[previous_index]
+        following = self._sorted[previous_index + 1]
+
+        # Same two-sided lerp as NumPy, which interpolates from the nearer neighbour
+        diff = following - previous
+        if gamma >= 0.5:
+            return following - diff * (1 - gamma)
+        return previous + diff * gamma
+
+    def __len__(self) -> int:
+        return len(self._sorted)
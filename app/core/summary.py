@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.core.metrics import calc_ebit_ttm, calc_ebit_growth
+from app.core.models import CycleSummary, QuarterlyHistory, StockHistoricalData
+
+CYCLE_YEARS = (5, 1)  # EV/EBIT cycle windows analyze_stock compares against
+
+
+def compute_cycle_summary(history: StockHistoricalData) -> CycleSummary | None:
+    """Cycle summary as of the last stored day, or None for a history without daily rows."""
+    daily = history.daily
+    if len(daily) == 0:
+        return None
+    as_of = daily.dates[-1].astype(object)
+
+    date_ago = np.datetime64(as_of - timedelta(days=365 * max(CYCLE_YEARS)), "D")
+    window = daily.between(start=date_ago)
+    positive = window.ev_ebit > 0
+
+    quarterly = history.quarterly
+    ebits, ebit_ttm, ebit_growth = calc_ebit_figures(quarterly, as_of)
+    pending = quarterly.filing_date[quarterly.filing_date > np.datetime64(as_of, "D")]
+
+    return CycleSummary(
+        as_of=as_of,
+        ev_ebit_dates=window.dates[positive],
+        ev_ebit=window.ev_ebit[positive],
+        ebits=ebits,
+        ebit_ttm=ebit_ttm,
+        ebit_growth=ebit_growth,
+        valid_until=pending.min().astype(object) if len(pending) else None,
+    )
+
+
+def calc_ebit_figures(
+        quarterly: QuarterlyHistory,
+        day: date,
+) -> tuple[list[float | None], float | None, float | None]:
+    """Latest eight quarterly EBITs filed by `day` (newest first), EBIT TTM and EBIT YoY growth."""
+    filed_quarters = np.flatnonzero(quarterly.filed_mask(day))[::-1]
+    quarterly_ebits = [None if np.isnan(ebit) else float(ebit) for ebit in quarterly.ebit[filed_quarters[:8]]]
+
+    ebit_ttm_current = None
+    if len(filed_quarters) >= 4:
+        ebit_ttm_current = calc_ebit_ttm(quarterly_ebits[:4])
+
+    ebit_growth = None
+    if len(filed_quarters) >= 8:
+        ebit_ttm_prior = calc_ebit_ttm(quarterly_ebits[4:8])
+        ebit_growth = calc_ebit_growth(ebit_ttm_current, ebit_ttm_prior)
+
+    return quarterly_ebits, ebit_ttm_current, ebit_growth
@@ -0,0 +1,173 @@
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.core.metrics import calc_ebit_ttm, calc_ebit_growth
+from app.core.models import StockHistoricalData
+from app.core.rolling import RollingQuantile
+
+
+@dataclass
+class MetricsTimeline:
+    """StockMetrics of one stock evaluated on every analysis day (NaN stands for None)."""
+    dates: np.ndarray  # datetime64[D]
+    ev_ebit: np.ndarray
+    ev_ebit_q1_5y: np.ndarray
+    ev_ebit_q1_1y: np.ndarray
+    ev_ebit_days_5y: np.ndarray
+    ev_ebit_days_1y: np.ndarray
+    ebit_ttm: np.ndarray
+    ebit_growth: np.ndarray
+
+
+@dataclass
+class SignalsTimeline:
+    """StockSignals of one stock evaluated on every analysis day."""
+    ev_ebit_5y_cycle: np.ndarray
+    ev_ebit_1y_cycle: np.ndarray
+    ebit_positive: np.ndarray
+    ebit_growth_positive: np.ndarray
+
+    @property
+    def all_signals_pass(self) -> np.ndarray:
+        return (
+                self.ev_ebit_5y_cycle
+                & self.ev_ebit_1y_cycle
+                & self.ebit_positive
+                & self.ebit_growth_positive
+        )
+
+
+def compute_metrics_timeline(history: StockHistoricalData, dates: list[date]) -> MetricsTimeline:
+    """Vectorized equivalent of `_calculate_metrics(stock, target_date=day)` for every day in ascending `dates`."""
+    # EV/EBIT (current)
+    ev_ebit = compute_ev_ebit_timeline(history, dates)
+
+    # EV/EBIT (historical cycle)
+    ev_ebit_q1_5y, ev_ebit_days_5y = compute_ev_ebit_percentile_timeline(history, dates, 5, 25)
+    ev_ebit_q1_1y, ev_ebit_days_1y = compute_ev_ebit_percentile_timeline(history, dates, 1, 25)
+
+    # EBIT TTM & EBIT YoY Growth
+    ebit_ttm, ebit_growth = compute_ebit_timeline(history, dates)
+
+    return MetricsTimeline(
+        dates=np.array(dates, dtype="datetime64[D]"),
+        ev_ebit=ev_ebit,
+        ev_ebit_q1_5y=ev_ebit_q1_5y,
+        ev_ebit_q1_1y=ev_ebit_q1_1y,
+        ev_ebit_days_5y=ev_ebit_days_5y,
+        ev_ebit_days_1y=ev_ebit_days_1y,
+        ebit_ttm=ebit_ttm,
+        ebit_growth=ebit_growth,
+    )
+
+
+def compute_ev_ebit_timeline(history: StockHistoricalData, dates: list[date]) -> np.ndarray:
+    """Latest daily EV/EBIT on or before every day in `dates` (NaN for None)."""
+    latest_idx = np.searchsorted(history.daily.dates, np.array(dates, dtype="datetime64[D]"), side="right") - 1
+    return np.concatenate([[np.nan], history.daily.ev_ebit])[latest_idx + 1]
+
+
+def compute_ev_ebit_percentile_timeline(
+        history: StockHistoricalData,
+        dates: list[date],
+        years: int,
+        percentile: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    EV/EBIT percentile over the trailing `years` calendar window on every day in `dates`.
+
+    `dates` must be ascending. Returns (percentile values with NaN for None, window day counts).
+    """
+    values, counts = compute_ev_ebit_percentiles_timeline(history, dates, years, [percentile])
+    return values[:, 0], counts
+
+
+def compute_ev_ebit_percentiles_timeline(
+        history: StockHistoricalData,
+        dates: list[date],
+        years: int,
+        percentiles: list[float],
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Several EV/EBIT percentiles of the same trailing window in one pass over `dates`.
+
+    Returns (dates x percentiles values with NaN for None, window day counts).
+    """
+    daily = history.daily
+    positive = daily.ev_ebit > 0
+    positive_dates = daily.dates[positive].astype(object).tolist()
+    positive_values = daily.ev_ebit[positive].tolist()
+
+    values = np.full((len(dates), len(percentiles)), np.nan)
+    counts = np.zeros(len(dates), dtype=np.int64)
+    if not dates:
+        return values, counts
+
+    window = RollingQuantile(days=365 * years)
+    j = bisect_left(positive_dates, dates[0] - timedelta(days=365 * years))
+    for i, day in enumerate(dates):
+        while j < len(positive_dates) and positive_dates[j] <= day:
+            window.push(positive_dates[j], positive_values[j])
+            j += 1
+        window.advance(day)
+
+        counts[i] = len(window)
+        if counts[i] == 0:
+            continue
+        for k, percentile in enumerate(percentiles):
+            values[i, k] = window.percentile(percentile)
+    return values, counts
+
+
+def compute_ebit_timeline(history: StockHistoricalData, dates: list[date]) -> tuple[np.ndarray, np.ndarray]:
+    """EBIT TTM and EBIT YoY growth as of every day in `dates` (NaN for None)."""
+    days = np.array(dates, dtype="datetime64[D]")
+
+    # The set of filed quarters only changes on filing dates, so TTM and growth are
+    # evaluated once per distinct filing date and then looked up for every day.
+    quarterly = history.quarterly
+    filing_dates = np.unique(quarterly.filing_date[~np.isnat(quarterly.filing_date)])
+
+    ebit_ttm_events = [np.nan]
+    ebit_growth_events = [np.nan]
+    for filing_date in filing_dates:
+        filed_quarters = np.flatnonzero(quarterly.filing_date <= filing_date)[::-1]
+        quarterly_ebits = [None if np.isnan(ebit) else float(ebit) for ebit in quarterly.ebit[filed_quarters[:8]]]
+
+        ebit_ttm_current = None
+        if len(filed_quarters) >= 4:
+            ebit_ttm_current = calc_ebit_ttm(quarterly_ebits[:4])
+
+        ebit_growth = None
+        if len(filed_quarters) >= 8:
+            ebit_ttm_prior = calc_ebit_ttm(quarterly_ebits[4:8])
+            ebit_growth = calc_ebit_growth(ebit_ttm_current, ebit_ttm_prior)
+
+        ebit_ttm_events.append(np.nan if ebit_ttm_current is None else ebit_ttm_current)
+        ebit_growth_events.append(np.nan if ebit_growth is None else ebit_growth)
+
+    event_idx = np.searchsorted(filing_dates, days, side="right")
+    return (
+        np.array(ebit_ttm_events, dtype=np.float64)[event_idx],
+        np.array(ebit_growth_events, dtype=np.float64)[event_idx],
+    )
+
+
+def compute_signals_timeline(metrics: MetricsTimeline) -> SignalsTimeline:
+    """Vectorized equivalent of the signal functions in `app.core.signals`."""
+    return SignalsTimeline(
+        ev_ebit_5y_cycle=signal_ev_ebit_cycle_timeline(metrics.ev_ebit, metrics.ev_ebit_q1_5y),
+        ev_ebit_1y_cycle=signal_ev_ebit_cycle_timeline(metrics.ev_ebit, metrics.ev_ebit_q1_1y),
+        ebit_positive=metrics.ebit_ttm > 0,
+        ebit_growth_positive=metrics.ebit_growth > 0,
+    )
+
+
+def signal_ev_ebit_cycle_timeline(ev_ebit_current: np.ndarray, ev_ebit_q1: np.ndarray) -> np.ndarray:
+    """
+    EV_EBIT < Q_1 (NaN compares False, matching the None checks of `signal_ev_ebit_cycle`)
+    """
+    return (ev_ebit_current > 0) & (ev_ebit_current < ev_ebit_q1)
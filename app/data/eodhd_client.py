@@ -1,41 +1,164 @@
 import os
-from datetime import date
+import random
+import time
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Any
 
 import requests
-from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 from app.core.models import StockQuarterlyData
-
-load_dotenv()
+from app.core.profiling import count, traced
+from app.data.rate_limit import ProviderLimiter
+from app.data.request_stats import EndpointStats, RequestStats
 
 
 class EODHDClient:
     BASE_URL = "https://eodhd.com/api"
-
-    def __init__(self):
-        api_key = os.getenv("API_KEY")
+    MAX_CONCURRENT = 8
+    REQUESTS_PER_SECOND = 15.0  # the paid plans allow 1000 requests per minute
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    # The only parts of the fundamentals payload the app reads
+    FUNDAMENTALS_SECTIONS = (
+        "General::Name",
+        "Financials::Income_Statement::quarterly",
+        "Financials::Balance_Sheet::quarterly",
+    )
+    INCOME_STATEMENT_FIELDS = ("operatingIncome",)
+    BALANCE_SHEET_FIELDS = (
+        "filing_date",
+        "shortLongTermDebtTotal",
+        "longTermDebt",
+        "shortTermDebt",
+        "cashAndShortTermInvestments",
+        "commonStockSharesOutstanding",
+    )
+
+    def __init__(
+            self,
+            limiter: ProviderLimiter | None = None,
+            pool_size: int = MAX_CONCURRENT,
+            timeout: tuple[float, float] = (5.0, 30.0),  # (connect, read) seconds
+            max_retries: int = 4,
+            backoff: float = 0.5,  # first retry delay in seconds, doubled on every retry
+            max_backoff: float = 30.0,
+            max_retry_after: float = 300.0,  # longest server-requested wait honoured before giving up
+            session: requests.Session | None = None,  # e.g. a recording or replaying stand-in
+            api_key: str | None = None,
+    ):
+        if api_key is None:
+            from dotenv import load_dotenv
+            load_dotenv()
+            api_key = os.getenv("API_KEY")
         assert api_key
         self.api_key = api_key
-
+        self.limiter = limiter or ProviderLimiter(self.MAX_CONCURRENT, self.REQUESTS_PER_SECOND)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.request_stats = RequestStats()
+
+        # Keep-alive connections shared by all threads; retries are handled below
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0))
+        self.session = session
+
+    @property
+    def stats(self) -> dict[str, EndpointStats]:
+        """Latency and retry counters per endpoint (e.g. "fundamentals")."""
+        return self.request_stats.snapshot()
+
+    @traced("eodhd.request")
     def _fetch_json(self, endpoint: str, params: dict[str, Any] | None = None) -> dict[str, Any] | list[Any]:
         url = f"{self.BASE_URL}/{endpoint}"
         request_params = {"api_token": self.api_key, "fmt": "json"}
         if params:
             request_params.update(params)
 
-        response = requests.get(url, params=request_params)
-        response.raise_for_status()
-        return response.json()
+        start = time.perf_counter()
+        retries = 0
+        try:
+            while True:
+                try:
+                    with self.limiter:
+                        response = self.session.get(url, params=request_params, timeout=self.timeout)
+                except (requests.ConnectionError, requests.Timeout):
+                    if retries == self.max_retries:
+                        raise
+                    delay = self._backoff_delay(retries)
+                else:
+                    if response.status_code not in self.RETRY_STATUSES or retries == self.max_retries:
+                        response.raise_for_status()
+                        result = response.json()
+                        size = len(response.content)
+                        break
+                    delay = self._retry_after(response)
+                    if delay is None:
+                        delay = self._backoff_delay(retries)
+                    elif delay > self.max_retry_after:
+                        # Retrying before the server allows it would only burn the remaining retries
+                        response.raise_for_status()
+                retries += 1
+                time.sleep(delay)
+        except Exception:
+            self.request_stats.record(self._endpoint_name(endpoint), time.perf_counter() - start, retries, failed=True)
+            raise
+        self.request_stats.record(
+            self._endpoint_name(endpoint), time.perf_counter() - start, retries, failed=False, size=size,
+        )
+        count("eodhd.bytes", size)
+        count("eodhd.retries", retries)
+        return result
+
+    def _backoff_delay(self, retries: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** retries))
 
-    def fetch_fundamentals(self, ticker: str, exchange: str = "US") -> dict[str, Any]:
-        result = self._fetch_json(f"fundamentals/{ticker}.{exchange}")
+    def _retry_after(self, response: requests.Response) -> float | None:
+        """Delay requested by a Retry-After header (seconds or an HTTP date), in seconds."""
+        value = response.headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return max(0.0, seconds)
+
+    @staticmethod
+    def _endpoint_name(endpoint: str) -> str:
+        """Group stats by API rather than ticker: "fundamentals/AAPL.US" -> "fundamentals"."""
+        return endpoint.split("/", 1)[0]
+
+    def fetch_fundamentals(self, ticker: str, exchange: str = "US", slim: bool = True) -> dict[str, Any]:
+        """
+        Fundamentals in the provider's nested layout.
+
+        Slim fetches request only `FUNDAMENTALS_SECTIONS` (a small fraction of the full
+        payload) and keep only the quarterly fields `extract_quarterly_history` reads.
+        """
+        if not slim:
+            result = self._fetch_json(f"fundamentals/{ticker}.{exchange}")
+            assert isinstance(result, dict)
+            return result
+
+        result = self._fetch_json(
+            f"fundamentals/{ticker}.{exchange}",
+            {"filter": ",".join(self.FUNDAMENTALS_SECTIONS)},
+        )
         assert isinstance(result, dict)
-        return result
+        return self._slim_fundamentals(result)
 
     def fetch_company_name(self, ticker: str) -> str:
-        fundamentals = self.fetch_fundamentals(ticker)
-        return fundamentals.get("General", {}).get("Name", ticker)
+        return self.extract_company_name(self.fetch_fundamentals(ticker), ticker)
 
     # =========================================================================
     # Domain Mapping
@@ -52,6 +175,33 @@ class EODHDClient:
             return None
         return (long_term or 0.0) + (short_term or 0.0)
 
+    def _slim_fundamentals(self, result: dict[str, Any]) -> dict[str, Any]:
+        """Nest a filtered response (keyed by section path, e.g. "General::Name") and drop unread fields."""
+        fundamentals: dict[str, Any] = {}
+        for path, value in result.items():
+            *parents, leaf = path.split("::")
+            node = fundamentals
+            for parent in parents:
+                node = node.setdefault(parent, {})
+            node[leaf] = value
+
+        financials = fundamentals.get("Financials", {})
+        for statement, fields in (
+                ("Income_Statement", self.INCOME_STATEMENT_FIELDS),
+                ("Balance_Sheet", self.BALANCE_SHEET_FIELDS),
+        ):
+            quarterly = financials.get(statement, {}).get("quarterly")
+            if isinstance(quarterly, dict):
+                financials[statement]["quarterly"] = {
+                    quarter: {field: data[field] for field in fields if field in data}
+                    for quarter, data in quarterly.items()
+                    if isinstance(data, dict)
+                }
+        return fundamentals
+
+    def extract_company_name(self, fundamentals: dict[str, Any], ticker: str) -> str:
+        return fundamentals.get("General", {}).get("Name", ticker)
+
     def extract_quarterly_history(self, fundamentals: dict[str, Any]) -> dict[date, StockQuarterlyData]:
         financials = fundamentals.get("Financials", {})
         income_statement = financials.get("Income_Statement", {}).get("quarterly", {})
@@ -1,40 +1,147 @@
+import math
 from datetime import date
 
-from app.core.models import StockDailyData, StockQuarterlyData, StockHistoricalData
-from app.core.pit import compute_pit_ev_ebit
+import numpy as np
+
+from app.core.models import DailyHistory, QuarterlyHistory, StockQuarterlyData, StockHistoricalData
+from app.core.pit import compute_pit_ev_ebit_series, first_affected_day
 from app.data.eodhd_client import EODHDClient
-from app.data.yfinance_client import YfinanceClient
+from app.data.yfinance_client import PriceHistory, YfinanceClient
+
+# Relative change of an already stored close that means yfinance re-adjusted past prices
+ADJUSTMENT_TOLERANCE = 1e-6
+
+# Stored tickers whose refresh anchors are this close share one bulk download
+ANCHOR_WINDOW_DAYS = 7
 
 
 class HistoryDataFetcher:
-    def __init__(self):
-        self.eodhd = EODHDClient()
-        self.yfinance = YfinanceClient()
+    def __init__(self, eodhd: EODHDClient | None = None, yfinance: YfinanceClient | None = None):
+        self.eodhd = eodhd or EODHDClient()
+        self.yfinance = yfinance or YfinanceClient()
+
+    def prefetch_prices(
+            self,
+            tickers: list[str],
+            stored: dict[str, StockHistoricalData] | None = None,
+    ) -> dict[str, PriceHistory]:
+        """
+        Bulk-download the prices `fetch`/`refresh` need for many tickers at once.
+
+        Stored tickers only need bars from their refresh anchor on: tickers whose anchors
+        lie within `ANCHOR_WINDOW_DAYS` of each other share one download from the earliest
+        of them, so a single stale ticker does not widen everyone's download. The others get
+        their full history. A failed bulk download only loses its own group, whose tickers
+        then fall back to their own downloads in `fetch`/`refresh`.
+        """
+        stored = stored or {}
+        anchors = sorted(
+            (stored[ticker].daily.dates[-2].astype(object), ticker)
+            for ticker in tickers
+            if ticker in stored and len(stored[ticker].daily) >= 2
+        )
+        anchored = {ticker for _, ticker in anchors}
+        new_tickers = [ticker for ticker in tickers if ticker not in anchored]
 
-    def fetch(self, ticker: str) -> StockHistoricalData:
+        groups: list[tuple[date, list[str]]] = []
+        for anchor, ticker in anchors:
+            if groups and (anchor - groups[-1][0]).days <= ANCHOR_WINDOW_DAYS:
+                groups[-1][1].append(ticker)
+            else:
+                groups.append((anchor, [ticker]))
+
+        prices = self._fetch_price_histories(new_tickers, None) if new_tickers else {}
+        for start, group in groups:
+            prices |= self._fetch_price_histories(group, start)
+        return prices
+
+    def _fetch_price_histories(self, tickers: list[str], start: date | None) -> dict[str, PriceHistory]:
+        try:
+            return self.yfinance.fetch_price_histories(tickers, start=start)
+        except Exception:
+            return {}  # each ticker is downloaded on its own instead, failing only itself
+
+    def fetch(self, ticker: str, prices: PriceHistory | None = None) -> StockHistoricalData:
+        """Full history; `prices` is a prefetched full price history, if any."""
         fundamentals = self.eodhd.fetch_fundamentals(ticker)
         quarterly_history = self.eodhd.extract_quarterly_history(fundamentals)
-        daily_history = self._build_daily_history(ticker, quarterly_history)
+        daily_history = self._build_daily_history(ticker, quarterly_history, prices)
 
         return StockHistoricalData(
             daily=daily_history,
-            quarterly=quarterly_history,
+            quarterly=QuarterlyHistory.from_dict(quarterly_history),
+            name=self.eodhd.extract_company_name(fundamentals, ticker),
+        )
+
+    def refresh(
+            self,
+            ticker: str,
+            history: StockHistoricalData,
+            prices: PriceHistory | None = None,
+    ) -> StockHistoricalData:
+        """
+        Bring a stored history up to date, fetching only the bars after it.
+
+        The last stored bar is refetched (it may have been taken intraday), and the one
+        before it anchors the check that past closes were not re-adjusted for a split or
+        dividend; if they were, the whole history is refetched. EV/EBIT is recomputed only
+        for new bars and for days a new or revised quarter can affect. `prices` is a
+        prefetched price history covering the anchor, if any.
+        """
+        daily = history.daily
+        if len(daily) < 2:
+            return self.fetch(ticker)
+
+        fundamentals = self.eodhd.fetch_fundamentals(ticker)
+        quarterly_history = self.eodhd.extract_quarterly_history(fundamentals)
+        quarterly = QuarterlyHistory.from_dict(quarterly_history)
+        name = self.eodhd.extract_company_name(fundamentals, ticker)
+
+        anchor = daily.dates[-2]
+        if prices is None:
+            prices = self.yfinance.fetch_price_history(ticker, start=anchor.astype(object))
+        i = int(np.searchsorted(prices.dates, anchor))
+        if (
+                i >= len(prices)
+                or prices.dates[i] != anchor
+                or not math.isclose(prices.close[i], daily.price[-2], rel_tol=ADJUSTMENT_TOLERANCE)
+        ):
+            return StockHistoricalData(
+                daily=self._build_daily_history(ticker, quarterly_history),
+                quarterly=quarterly,
+                name=name,
+            )
+
+        dates = np.concatenate((daily.dates[:-1], prices.dates[i + 1:]))
+        price = np.concatenate((daily.price[:-1], prices.close[i + 1:]))
+        ev_ebit = np.concatenate((daily.ev_ebit[:-1], np.full(len(prices) - i - 1, np.nan)))
+
+        recompute_from = daily.dates[-1]
+        affected = first_affected_day(history.quarterly, quarterly)
+        if affected is not None:
+            recompute_from = min(recompute_from, np.datetime64(affected, "D"))
+        start = int(np.searchsorted(dates, recompute_from))
+        ev_ebit[start:] = compute_pit_ev_ebit_series(dates[start:], price[start:], sorted(quarterly_history.items()))
+
+        return StockHistoricalData(
+            daily=DailyHistory(dates=dates, price=price, ev_ebit=ev_ebit),
+            quarterly=quarterly,
+            name=name,
         )
 
     def _build_daily_history(
             self,
             ticker: str,
             quarterly_history: dict[date, StockQuarterlyData],
-    ) -> dict[date, StockDailyData]:
-        prices = self.yfinance.fetch_price_history(ticker)
-        if not prices:
-            return {}
+            prices: PriceHistory | None = None,
+    ) -> DailyHistory:
+        if prices is None:
+            prices = self.yfinance.fetch_price_history(ticker)
 
         quarterly_records = sorted(quarterly_history.items())
 
-        daily_data: dict[date, StockDailyData] = {}
-        for day, price in prices.items():
-            ev_ebit = compute_pit_ev_ebit(day, price, quarterly_records)
-            daily_data[day] = StockDailyData(price=price, ev_ebit=ev_ebit)
-
-        return daily_data
+        return DailyHistory(
+            dates=prices.dates,
+            price=prices.close,
+            ev_ebit=compute_pit_ev_ebit_series(prices.dates, prices.close, quarterly_records),
+        )
@@ -1,19 +1,264 @@
+import json
+import os
 import pickle
+import re
+from collections.abc import Iterable
+from datetime import date
 from pathlib import Path
 
-from app.core.models import StockHistoricalData
+import numpy as np
 
-historical_data_file_path = Path(__file__).parent.parent.parent.resolve() / "data" / "historical_data.pkl"
+from app.core.models import StockHistoricalData, DailyHistory, QuarterlyHistory, CycleSummary
+from app.core.profiling import traced
+from app.core.summary import compute_cycle_summary
 
+historical_data_dir_path = Path(__file__).parent.parent.parent.resolve() / "data" / "historical_data"
 
-def save_historical_data(data: dict[str, StockHistoricalData]) -> None:
-    historical_data_file_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(historical_data_file_path, "wb") as f:
-        pickle.dump(data, f)
+MANIFEST_NAME = "manifest.json"
+STORE_VERSION = 1
 
+# One structured record per row, so a ticker's table is a single memory-mappable .npy file
+DAILY_DTYPE = np.dtype([("dates", "datetime64[D]"), ("price", "float64"), ("ev_ebit", "float64")])
+QUARTERLY_DTYPE = np.dtype([
+    ("dates", "datetime64[D]"),
+    ("filing_date", "datetime64[D]"),
+    ("ebit", "float64"),
+    ("total_debt", "float64"),
+    ("cash", "float64"),
+    ("shares_outstanding", "float64"),
+])
+CYCLE_DTYPE = np.dtype([("dates", "datetime64[D]"), ("ev_ebit", "float64")])
 
-def load_historical_data() -> dict[str, StockHistoricalData]:
-    if not historical_data_file_path.exists():
+
+# =============================================================================
+# Save
+# =============================================================================
+
+def save_historical_data(data: dict[str, StockHistoricalData], path: Path = historical_data_dir_path) -> None:
+    """Write every ticker's segment and a manifest listing exactly these tickers."""
+    path.mkdir(parents=True, exist_ok=True)
+    previous = _read_manifest(path) or {}
+    manifest = {ticker: _write_segment(path, ticker, history) for ticker, history in data.items()}
+    _write_manifest(path, manifest)
+
+    # Segments of tickers no longer in the store
+    for ticker in previous.keys() - manifest.keys():
+        entry = previous[ticker]
+        for key in ("daily", "quarterly"):
+            (path / entry[key]).unlink(missing_ok=True)
+        if entry.get("summary"):
+            (path / entry["summary"]["cycle"]).unlink(missing_ok=True)
+
+
+def save_ticker_history(ticker: str, history: StockHistoricalData, path: Path = historical_data_dir_path) -> None:
+    """Write (or replace) one ticker's segment, leaving the other tickers untouched."""
+    with HistoryStoreWriter(path) as writer:
+        writer.save(ticker, history)
+
+
+class HistoryStoreWriter:
+    """
+    Writes ticker segments one by one as they become available.
+
+    Each segment is on disk as soon as `save` returns; the manifest is rewritten every
+    `flush_every` tickers and on close, so a crash can only lose the manifest entries
+    of tickers that were new to the store since the last flush.
+    """
+
+    def __init__(self, path: Path = historical_data_dir_path, flush_every: int = 50):
+        path.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.flush_every = flush_every
+        self._manifest = _read_manifest(path) or {}
+        self._pending = 0
+
+    @traced("HistoryStoreWriter.save")
+    def save(self, ticker: str, history: StockHistoricalData) -> None:
+        self._manifest[ticker] = _write_segment(self.path, ticker, history)
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    @traced("HistoryStoreWriter.flush")
+    def flush(self) -> None:
+        if self._pending:
+            _write_manifest(self.path, self._manifest)
+            self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "HistoryStoreWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# =============================================================================
+# Load
+# =============================================================================
+
+@traced("load_historical_data")
+def load_historical_data(
+        tickers: Iterable[str] | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        path: Path = historical_data_dir_path,
+        mmap: bool = True,
+        summary_only: bool = False,
+) -> dict[str, StockHistoricalData]:
+    """
+    Histories of `tickers` (all stored tickers if None) with daily rows in [start_date, end_date].
+
+    Segments are memory-mapped, so only the pages a run actually reads are loaded; pass
+    mmap=False to get in-memory copies (e.g. before rewriting the same files). Falls back
+    to the legacy `<path>.pkl` pickle when no store has been written yet. Quarterly
+    history is always complete, since point-in-time lookups need earlier filings.
+
+    Each history carries its stored cycle summary unless `end_date` cuts the daily rows
+    short. With `summary_only`, daily rows are skipped for tickers that have a summary,
+    which is all live analysis reads.
+    """
+    manifest = _read_manifest(path)
+    if manifest is None:
+        return _load_legacy_pickle(path.with_suffix(".pkl"), tickers, start_date, end_date)
+
+    selected = manifest if tickers is None else [ticker for ticker in tickers if ticker in manifest]
+    mmap_mode = "r" if mmap else None
+    data: dict[str, StockHistoricalData] = {}
+    for ticker in selected:
+        entry = manifest[ticker]
+        summary = None
+        if entry.get("summary") and end_date is None:
+            summary = _load_summary(path, entry["summary"], mmap_mode)
+        if summary_only and summary is not None:
+            daily = np.empty(0, dtype=DAILY_DTYPE)
+        else:
+            daily = np.load(path / entry["daily"], mmap_mode=mmap_mode)
+        quarterly = np.load(path / entry["quarterly"], mmap_mode=mmap_mode)
+        data[ticker] = StockHistoricalData(
+            daily=DailyHistory(**_columns(daily, DAILY_DTYPE)).between(start_date, end_date),
+            quarterly=QuarterlyHistory(**_columns(quarterly, QUARTERLY_DTYPE)),
+            name=entry.get("name"),
+            summary=summary,
+        )
+    return data
+
+
+def stored_tickers(path: Path = historical_data_dir_path) -> list[str]:
+    manifest = _read_manifest(path)
+    return list(manifest) if manifest is not None else []
+
+
+def _load_legacy_pickle(
+        pickle_path: Path,
+        tickers: Iterable[str] | None,
+        start_date: date | None,
+        end_date: date | None,
+) -> dict[str, StockHistoricalData]:
+    if not pickle_path.exists():
         return {}
-    with open(historical_data_file_path, "rb") as f:
-        return pickle.load(f)
+    with open(pickle_path, "rb") as f:
+        data: dict[str, StockHistoricalData] = pickle.load(f)
+    if tickers is not None:
+        data = {ticker: data[ticker] for ticker in tickers if ticker in data}
+    for history in data.values():
+        history.daily = history.daily.between(start_date, end_date)
+    return data
+
+
+# =============================================================================
+# Segments & Manifest
+# =============================================================================
+
+def _write_segment(path: Path, ticker: str, history: StockHistoricalData) -> dict:
+    stem = _file_stem(ticker)
+    entry = {
+        "name": history.name,
+        "daily": f"{stem}.daily.npy",
+        "quarterly": f"{stem}.quarterly.npy",
+        "daily_rows": len(history.daily),
+        "quarterly_rows": len(history.quarterly),
+        "first_date": str(history.daily.dates[0]) if len(history.daily) else None,
+        "last_date": str(history.daily.dates[-1]) if len(history.daily) else None,
+    }
+    _atomic_save(path / entry["daily"], _records(history.daily, DAILY_DTYPE))
+    _atomic_save(path / entry["quarterly"], _records(history.quarterly, QUARTERLY_DTYPE))
+    entry["summary"] = _write_summary(path, stem, history)
+    return entry
+
+
+def _write_summary(path: Path, stem: str, history: StockHistoricalData) -> dict | None:
+    """Persist the history's cycle summary (computed here unless ingestion attached a current one)."""
+    summary = history.summary
+    if summary is None or len(history.daily) == 0 or summary.as_of != history.daily.dates[-1].astype(object):
+        summary = compute_cycle_summary(history)
+    if summary is None:
+        return None
+
+    cycle = np.empty(len(summary.ev_ebit), dtype=CYCLE_DTYPE)
+    cycle["dates"] = summary.ev_ebit_dates
+    cycle["ev_ebit"] = summary.ev_ebit
+    entry = {
+        "as_of": str(summary.as_of),
+        "cycle": f"{stem}.cycle.npy",
+        "ebits": summary.ebits,
+        "ebit_ttm": summary.ebit_ttm,
+        "ebit_growth": summary.ebit_growth,
+        "valid_until": str(summary.valid_until) if summary.valid_until else None,
+    }
+    _atomic_save(path / entry["cycle"], cycle)
+    return entry
+
+
+def _load_summary(path: Path, entry: dict, mmap_mode: str | None) -> CycleSummary:
+    cycle = np.load(path / entry["cycle"], mmap_mode=mmap_mode)
+    return CycleSummary(
+        as_of=date.fromisoformat(entry["as_of"]),
+        ev_ebit_dates=cycle["dates"],
+        ev_ebit=cycle["ev_ebit"],
+        ebits=entry["ebits"],
+        ebit_ttm=entry["ebit_ttm"],
+        ebit_growth=entry["ebit_growth"],
+        valid_until=date.fromisoformat(entry["valid_until"]) if entry["valid_until"] else None,
+    )
+
+
+def _read_manifest(path: Path) -> dict[str, dict] | None:
+    manifest_path = path / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    assert manifest["version"] == STORE_VERSION, f"Unsupported history store version {manifest['version']}"
+    return manifest["tickers"]
+
+
+def _write_manifest(path: Path, tickers: dict[str, dict]) -> None:
+    manifest_path = path / MANIFEST_NAME
+    temp_path = manifest_path.with_suffix(".tmp")
+    temp_path.write_text(json.dumps({"version": STORE_VERSION, "tickers": tickers}, indent=2), encoding="utf-8")
+    os.replace(temp_path, manifest_path)
+
+
+def _atomic_save(file_path: Path, array: np.ndarray) -> None:
+    temp_path = file_path.with_suffix(".tmp")
+    with open(temp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(temp_path, file_path)
+
+
+def _records(table: DailyHistory | QuarterlyHistory, dtype: np.dtype) -> np.ndarray:
+    records = np.empty(len(table), dtype=dtype)
+    for name in dtype.names:
+        records[name] = getattr(table, name)
+    return records
+
+
+def _columns(records: np.ndarray, dtype: np.dtype) -> dict[str, np.ndarray]:
+    return {name: records[name] for name in dtype.names}
+
+
+def _file_stem(ticker: str) -> str:
+    """File-system safe name for a ticker (e.g. "BRK/B" -> "BRK_B")."""
+    return re.sub(r"[^A-Za-z0-9.\-]", "_", ticker)
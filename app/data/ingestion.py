@@ -0,0 +1,71 @@
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from app.core.models import StockHistoricalData
+from app.core.profiling import traced
+from app.core.summary import compute_cycle_summary
+from app.data.historical_data_fetcher import HistoryDataFetcher
+from app.data.yfinance_client import PriceHistory
+
+
+@dataclass(frozen=True)
+class IngestionResult:
+    ticker: str
+    history: StockHistoricalData | None  # None when the ticker failed
+    added_days: int = 0  # daily rows beyond the previously stored history
+    seconds: float = 0.0
+    error: str | None = None
+
+
+def ingest_histories(
+        fetcher: HistoryDataFetcher,
+        tickers: list[str],
+        stored: dict[str, StockHistoricalData] | None = None,
+        workers: int = 8,
+        batch_prices: bool = True,
+) -> Iterator[IngestionResult]:
+    """
+    Fetch (or refresh, for tickers in `stored`) every ticker's history on a thread pool.
+
+    Results are yielded as tickers finish, so the caller can persist and report each
+    one straight away; each history comes with its cycle summary. A failure is reported
+    in its result instead of being raised. The fetcher's clients cap how hard each
+    provider is hit, whatever `workers` is. With `batch_prices`, prices are
+    bulk-downloaded up front and tickers missing from the bulk result fall back to
+    their own download.
+    """
+    stored = stored or {}
+    prices = fetcher.prefetch_prices(tickers, stored) if batch_prices else {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest") as executor:
+        futures = [
+            executor.submit(_ingest_ticker, fetcher, ticker, stored.get(ticker), prices.get(ticker))
+            for ticker in tickers
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+@traced("ingest_ticker")
+def _ingest_ticker(
+        fetcher: HistoryDataFetcher,
+        ticker: str,
+        previous: StockHistoricalData | None,
+        prices: PriceHistory | None,
+) -> IngestionResult:
+    start = time.perf_counter()
+    try:
+        if previous is None:
+            history = fetcher.fetch(ticker, prices)
+        else:
+            history = fetcher.refresh(ticker, previous, prices)
+        history.summary = compute_cycle_summary(history)
+    except Exception as e:
+        return IngestionResult(ticker, None, seconds=time.perf_counter() - start, error=str(e))
+    return IngestionResult(
+        ticker,
+        history,
+        added_days=len(history.daily) - (len(previous.daily) if previous is not None else 0),
+        seconds=time.perf_counter() - start,
+    )
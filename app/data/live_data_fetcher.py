@@ -1,21 +1,52 @@
+import threading
 from datetime import date
+from typing import Any
 
-from app.core.models import StockLiveData
+from app.core.models import StockLiveData, StockQuarterlyData
 from app.core.pit import compute_pit_ev_ebit
 from app.data.eodhd_client import EODHDClient
 from app.data.yfinance_client import YfinanceClient
 
 
 class LiveDataFetcher:
-    def __init__(self):
-        self.eodhd = EODHDClient()
-        self.yfinance = YfinanceClient()
+    """
+    Live data for one run. Share one instance across the run: clients (and their
+    connection pools and rate limits) are reused, and each ticker's fundamentals are
+    downloaded at most once, even when several threads ask for them together.
+    """
+
+    def __init__(self, eodhd: EODHDClient | None = None, yfinance: YfinanceClient | None = None):
+        self.eodhd = eodhd or EODHDClient()
+        self.yfinance = yfinance or YfinanceClient()
+        self._fundamentals: dict[str, dict[str, Any]] = {}
+        self._prices: dict[str, float | None] = {}
+        self._ticker_locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def prefetch_prices(self, tickers: list[str]) -> None:
+        """
+        Bulk-download current prices for the run, instead of one request per `fetch`.
+
+        If the bulk download fails, each `fetch` requests its own price instead, so the
+        failure is reported per ticker rather than aborting the run.
+        """
+        try:
+            self._prices.update(self.yfinance.fetch_current_prices(tickers))
+        except Exception:
+            pass
 
     def fetch(self, ticker: str) -> StockLiveData:
-        price = self.yfinance.fetch_current_price(ticker)
-        fundamentals = self.eodhd.fetch_fundamentals(ticker)
-        quarterly_history = self.eodhd.extract_quarterly_history(fundamentals)
-        quarterly_records = sorted(quarterly_history.items())
+        price = self._prices.get(ticker)
+        if price is None:
+            price = self.yfinance.fetch_current_price(ticker)
+        return self.live_data(price, self.fetch_quarterly_records(ticker))
+
+    def fetch_quarterly_records(self, ticker: str) -> list[tuple[date, StockQuarterlyData]]:
+        """The ticker's quarters in date order, from its (cached) fundamentals."""
+        return sorted(self.eodhd.extract_quarterly_history(self.fetch_fundamentals(ticker)).items())
+
+    @staticmethod
+    def live_data(price: float | None, quarterly_records: list[tuple[date, StockQuarterlyData]]) -> StockLiveData:
         ev_ebit = (
             compute_pit_ev_ebit(date.today(), price, quarterly_records)
             if price is not None else None
@@ -23,4 +54,12 @@ class LiveDataFetcher:
         return StockLiveData(price=price, ev_ebit=ev_ebit)
 
     def fetch_company_name(self, ticker: str) -> str:
-        return self.eodhd.fetch_company_name(ticker)
+        return self.eodhd.extract_company_name(self.fetch_fundamentals(ticker), ticker)
+
+    def fetch_fundamentals(self, ticker: str) -> dict[str, Any]:
+        with self._lock:
+            ticker_lock = self._ticker_locks.setdefault(ticker, threading.Lock())
+        with ticker_lock:
+            if ticker not in self._fundamentals:
+                self._fundamentals[ticker] = self.eodhd.fetch_fundamentals(ticker)
+            return self._fundamentals[ticker]
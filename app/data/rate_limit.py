@@ -0,0 +1,66 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursts of up to `capacity`.
+
+    Callers reserve a token even when the bucket is empty and sleep off the debt
+    outside the lock, so waiting threads are served in arrival order.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        assert rate > 0
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take `tokens` only if they are available now."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+
+class ProviderLimiter:
+    """Caps one data provider's concurrent requests and their rate; use as a context manager."""
+
+    def __init__(self, max_concurrent: int, rate: float, burst: float | None = None):
+        self.max_concurrent = max_concurrent
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._bucket = TokenBucket(rate, burst)
+
+    def __enter__(self) -> "ProviderLimiter":
+        self._slots.acquire()
+        try:
+            self._bucket.acquire()
+        except BaseException:
+            self._slots.release()
+            raise
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._slots.release()
+
+    def charge(self, requests: float) -> None:
+        """Take extra rate tokens for a batch call that makes `requests` more requests under one slot."""
+        if requests > 0:
+            self._bucket.acquire(requests)
@@ -0,0 +1,298 @@
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from app.data.eodhd_client import EODHDClient
+from app.data.rate_limit import ProviderLimiter, TokenBucket
+from app.data.yfinance_client import YfinanceClient
+
+replay_dir_path = Path(__file__).parent.parent.parent.resolve() / "data" / "replay"
+
+CLOSE_DTYPE = np.dtype([("dates", "datetime64[D]"), ("close", "float64")])
+
+
+@dataclass(frozen=True)
+class FaultProfile:
+    """
+    Provider misbehaviour injected by the replay stand-ins.
+
+    Latency and failures are drawn per request from (seed, request, attempt), so a run
+    sees the same faults whatever its thread interleaving; only throttling depends on timing.
+    """
+    latency: float = 0.0  # seconds added to every request
+    jitter: float = 0.0  # up to this many seconds more, uniformly drawn
+    error_rate: float = 0.0  # share of requests that fail
+    rate_limit: float | None = None  # requests per second the provider serves before throttling
+    burst: float | None = None
+    seed: int = 0
+
+
+# =============================================================================
+# Archive
+# =============================================================================
+
+class ProviderArchive:
+    """
+    Recorded provider responses: EODHD JSON bodies by request, and yfinance closes by ticker.
+
+    Closes are kept per ticker rather than per download, so a replay can answer any mix
+    of batch sizes, periods and start dates from what was recorded.
+    """
+
+    def __init__(self, path: Path = replay_dir_path):
+        self.path = path
+        self._closes: dict[str, pd.Series | None] = {}
+        self._lock = threading.Lock()
+
+    def eodhd_response(self, key: str) -> Any | None:
+        file_path = self.path / "eodhd" / f"{key}.json"
+        if not file_path.exists():
+            return None
+        return json.loads(file_path.read_text(encoding="utf-8"))
+
+    def save_eodhd_response(self, key: str, body: Any) -> None:
+        _atomic_write(self.path / "eodhd" / f"{key}.json", json.dumps(body).encode("utf-8"))
+
+    def closes(self, ticker: str) -> pd.Series | None:
+        with self._lock:
+            if ticker not in self._closes:
+                file_path = self.path / "yfinance" / f"{_file_stem(ticker)}.npy"
+                records = np.load(file_path) if file_path.exists() else None
+                self._closes[ticker] = None if records is None else pd.Series(
+                    records["close"], index=pd.DatetimeIndex(records["dates"].astype("datetime64[ns]")),
+                )
+            return self._closes[ticker]
+
+    def save_closes(self, ticker: str, close: pd.Series) -> None:
+        """Merge `close` into the ticker's recorded closes; newer values win."""
+        close = close.dropna()
+        if close.empty:
+            return
+        previous = self.closes(ticker)
+        with self._lock:
+            if previous is not None:
+                close = pd.concat([previous[~previous.index.isin(close.index)], close]).sort_index()
+            self._closes[ticker] = close
+            records = np.empty(len(close), dtype=CLOSE_DTYPE)
+            records["dates"] = close.index.values.astype("datetime64[D]")
+            records["close"] = close.to_numpy(dtype=np.float64)
+            buffer = io.BytesIO()
+            np.save(buffer, records)
+            _atomic_write(self.path / "yfinance" / f"{_file_stem(ticker)}.npy", buffer.getvalue())
+
+
+def recording_clients(archive: ProviderArchive) -> tuple[EODHDClient, YfinanceClient]:
+    """Live clients that also write every successful response to `archive`."""
+    return (
+        EODHDClient(session=RecordingSession(archive, EODHDClient.MAX_CONCURRENT)),
+        RecordingYfinanceClient(archive),
+    )
+
+
+def replay_clients(
+        archive: ProviderArchive,
+        eodhd_faults: FaultProfile = FaultProfile(),
+        yfinance_faults: FaultProfile = FaultProfile(),
+) -> tuple[EODHDClient, YfinanceClient]:
+    """
+    Clients served from `archive` with injected faults; no network access or API key needed.
+
+    Everything above the provider call runs for real: connection limits, rate limiters,
+    retries with backoff, request stats, batching and caching.
+    """
+    return (
+        EODHDClient(session=ReplaySession(archive, eodhd_faults), api_key="replay"),
+        ReplayYfinanceClient(archive, yfinance_faults),
+    )
+
+
+# =============================================================================
+# EODHD
+# =============================================================================
+
+class RecordingSession(requests.Session):
+    """Pooled session that archives the body of every successful response."""
+
+    def __init__(self, archive: ProviderArchive, pool_size: int):
+        super().__init__()
+        self.archive = archive
+        self.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0))
+
+    def get(self, url: str, params: dict[str, Any] | None = None, **kwargs) -> requests.Response:
+        response = super().get(url, params=params, **kwargs)
+        if response.status_code == 200:
+            self.archive.save_eodhd_response(_request_key(url, params), response.json())
+        return response
+
+
+class ReplaySession:
+    """
+    Stands in for the EODHD client's session, answering from the archive.
+
+    Unrecorded requests get a 404, injected failures a 503 and throttled requests a 429
+    with Retry-After, as the real service would.
+    """
+
+    def __init__(self, archive: ProviderArchive, faults: FaultProfile = FaultProfile()):
+        self.archive = archive
+        self.faults = _FaultInjector(faults)
+
+    def get(self, url: str, params: dict[str, Any] | None = None, **kwargs) -> requests.Response:
+        key = _request_key(url, params)
+        fault = self.faults.apply(key)
+        if fault == "throttled":
+            return _response(url, 429, None, {"Retry-After": "1"})
+        if fault == "error":
+            return _response(url, 503, None)
+
+        body = self.archive.eodhd_response(key)
+        if body is None:
+            return _response(url, 404, {"error": "Ticker Not Found."})
+        return _response(url, 200, body)
+
+
+def _response(url: str, status_code: int, body: Any, headers: dict[str, str] | None = None) -> requests.Response:
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers or {})
+    response._content = json.dumps(body).encode("utf-8")
+    return response
+
+
+def _request_key(url: str, params: dict[str, Any] | None) -> str:
+    """Archive key of a request: its endpoint, plus a hash of any parameters besides the token and format."""
+    endpoint = url.removeprefix(EODHDClient.BASE_URL).strip("/")
+    key = _file_stem(endpoint)
+    extra = {name: value for name, value in (params or {}).items() if name not in ("api_token", "fmt")}
+    if extra:
+        key += "-" + hashlib.blake2b(json.dumps(extra, sort_keys=True).encode("utf-8"), digest_size=6).hexdigest()
+    return key
+
+
+# =============================================================================
+# yfinance
+# =============================================================================
+
+class RecordingYfinanceClient(YfinanceClient):
+    """Live yfinance client that also archives every close it downloads."""
+
+    def __init__(self, archive: ProviderArchive, limiter: ProviderLimiter | None = None):
+        super().__init__(limiter)
+        self.archive = archive
+
+    def _history_close(self, ticker: str, start: date | None) -> pd.Series:
+        close = super()._history_close(ticker, start)
+        self.archive.save_closes(ticker, close)
+        return close
+
+    def _download_frame(self, tickers: list[str], period: str | None, start: date | None) -> pd.DataFrame:
+        frame = super()._download_frame(tickers, period, start)
+        for ticker in frame:
+            self.archive.save_closes(ticker, frame[ticker])
+        return frame
+
+
+class ReplayYfinanceClient(YfinanceClient):
+    """
+    yfinance client answering from the archive.
+
+    An injected failure raises for a single-ticker history and drops the ticker from a
+    bulk download, which is how yfinance reports symbols it could not fetch.
+    """
+
+    def __init__(
+            self,
+            archive: ProviderArchive,
+            faults: FaultProfile = FaultProfile(),
+            limiter: ProviderLimiter | None = None,
+    ):
+        super().__init__(limiter)
+        self.archive = archive
+        self.faults = _FaultInjector(faults)
+
+    def _history_close(self, ticker: str, start: date | None) -> pd.Series:
+        fault = self.faults.apply(f"history/{ticker}")
+        if fault is not None:
+            raise ConnectionError(f"Injected {fault} response for {ticker}")
+        close = self.archive.closes(ticker)
+        return pd.Series(dtype=np.float64) if close is None else _window(close, None, start)
+
+    def _download_frame(self, tickers: list[str], period: str | None, start: date | None) -> pd.DataFrame:
+        # Symbols of one download are fetched in parallel: one delay, but a fault draw each
+        self.faults.apply(f"download/{','.join(tickers)}", failures=False)
+        columns: dict[str, pd.Series] = {}
+        for ticker in tickers:
+            close = self.archive.closes(ticker)
+            if close is None or self.faults.apply(f"download/{ticker}", delay=False) is not None:
+                continue
+            columns[ticker] = _window(close, period, start)
+        return pd.DataFrame(columns)
+
+
+def _window(close: pd.Series, period: str | None, start: date | None) -> pd.Series:
+    if start is not None:
+        close = close[close.index >= pd.Timestamp(start)]
+    if period is not None and period != "max":
+        assert period.endswith("d"), f"Unsupported period {period}"
+        close = close.iloc[-int(period[:-1]):]
+    return close
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+class _FaultInjector:
+    def __init__(self, faults: FaultProfile):
+        self.faults = faults
+        self._bucket = TokenBucket(faults.rate_limit, faults.burst) if faults.rate_limit else None
+        self._attempts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def apply(self, key: str, delay: bool = True, failures: bool = True) -> str | None:
+        """Sleep off the request's latency, then return "throttled", "error" or None (served)."""
+        with self._lock:
+            attempt = self._attempts[key]
+            self._attempts[key] += 1
+        rng = random.Random(f"{self.faults.seed}:{key}:{attempt}")
+
+        if delay:
+            seconds = self.faults.latency + rng.uniform(0, self.faults.jitter)
+            if seconds > 0:
+                time.sleep(seconds)
+        if not failures:
+            return None
+        if self._bucket is not None and not self._bucket.try_acquire():
+            return "throttled"
+        if rng.random() < self.faults.error_rate:
+            return "error"
+        return None
+
+
+def _atomic_write(file_path: Path, content: bytes) -> None:
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = file_path.with_suffix(".tmp")
+    temp_path.write_bytes(content)
+    os.replace(temp_path, file_path)
+
+
+def _file_stem(name: str) -> str:
+    """File-system safe name (e.g. "fundamentals/BRK-B.US" -> "fundamentals_BRK-B.US")."""
+    return re.sub(r"[^A-Za-z0-9.\-]", "_", name)
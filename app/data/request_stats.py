@@ -0,0 +1,41 @@
+import threading
+from dataclasses import dataclass, replace
+
+
+@dataclass(frozen=True)
+class EndpointStats:
+    requests: int = 0  # logical requests, however many attempts each took
+    retries: int = 0
+    failures: int = 0  # requests that still failed after all retries
+    total_seconds: float = 0.0  # wall time per request, including backoff
+    max_seconds: float = 0.0
+    total_bytes: int = 0  # response body bytes of successful requests
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.requests if self.requests else 0.0
+
+
+class RequestStats:
+    """Thread-safe per-endpoint latency and retry counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: dict[str, EndpointStats] = {}
+
+    def record(self, endpoint: str, seconds: float, retries: int, failed: bool, size: int = 0) -> None:
+        with self._lock:
+            stats = self._stats.get(endpoint, EndpointStats())
+            self._stats[endpoint] = replace(
+                stats,
+                requests=stats.requests + 1,
+                retries=stats.retries + retries,
+                failures=stats.failures + failed,
+                total_seconds=stats.total_seconds + seconds,
+                max_seconds=max(stats.max_seconds, seconds),
+                total_bytes=stats.total_bytes + size,
+            )
+
+    def snapshot(self) -> dict[str, EndpointStats]:
+        with self._lock:
+            return dict(self._stats)
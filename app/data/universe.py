@@ -0,0 +1,116 @@
+import csv
+from collections.abc import Iterable, Iterator
+from datetime import date
+from pathlib import Path
+
+from app.core.models import Stock, StockCategory, StockInfo
+from app.data.historical_data_storage import historical_data_dir_path, load_historical_data
+from app.data.watchlist import WATCHLIST
+
+universe_file_path = Path(__file__).parent.parent.parent.resolve() / "data" / "universe.csv"
+
+SHARD_SIZE = 500  # tickers whose histories are in memory at once
+
+
+class Universe:
+    """
+    Stocks to screen or backtest, indexed by ticker and category.
+
+    Entry points work through `shards` one at a time, so the histories in memory are
+    bounded by the shard size rather than the universe size.
+    """
+
+    def __init__(self, stocks: Iterable[StockInfo]):
+        self.stocks: list[StockInfo] = []
+        self._by_ticker: dict[str, StockInfo] = {}
+        self._by_category: dict[StockCategory, list[StockInfo]] = {category: [] for category in StockCategory}
+        for stock_info in stocks:
+            if stock_info.ticker in self._by_ticker:
+                continue
+            self.stocks.append(stock_info)
+            self._by_ticker[stock_info.ticker] = stock_info
+            self._by_category[stock_info.category].append(stock_info)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "Universe":
+        """
+        Read a CSV of `ticker,category` rows; the category is a StockCategory value or name.
+
+        A header row and lines starting with "#" are skipped. A malformed row raises a
+        ValueError naming its file and line.
+        """
+        stocks = []
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            for row in reader:
+                if not row or row[0].startswith("#") or row[0].strip().lower() == "ticker":
+                    continue
+                location = f"{path}:{reader.line_num}"
+                if len(row) < 2 or not row[0].strip():
+                    raise ValueError(f"{location}: expected a `ticker,category` row, got {row!r}")
+                ticker, category = (value.strip() for value in row[:2])
+                try:
+                    stocks.append(StockInfo(ticker, _parse_category(category)))
+                except KeyError:
+                    choices = ", ".join(category.value for category in StockCategory)
+                    raise ValueError(f"{location}: unknown category {category!r} (one of: {choices})") from None
+        return cls(stocks)
+
+    @property
+    def tickers(self) -> list[str]:
+        return [stock_info.ticker for stock_info in self.stocks]
+
+    def get(self, ticker: str) -> StockInfo | None:
+        return self._by_ticker.get(ticker)
+
+    def by_category(self, category: StockCategory) -> list[StockInfo]:
+        return list(self._by_category[category])
+
+    def shards(self, size: int = SHARD_SIZE) -> list["Universe"]:
+        """Consecutive slices of at most `size` stocks, in universe order."""
+        assert size > 0
+        return [Universe(self.stocks[i:i + size]) for i in range(0, len(self.stocks), size)]
+
+    def __contains__(self, ticker: object) -> bool:
+        return ticker in self._by_ticker
+
+    def __iter__(self) -> Iterator[StockInfo]:
+        return iter(self.stocks)
+
+    def __len__(self) -> int:
+        return len(self.stocks)
+
+
+def load_universe(path: Path = universe_file_path) -> Universe:
+    """The universe in `path`, or the built-in WATCHLIST when there is no such file."""
+    if path.exists():
+        return Universe.from_file(path)
+    return Universe(WATCHLIST)
+
+
+def load_stocks(
+        stock_infos: Iterable[StockInfo],
+        start_date: date | None = None,
+        end_date: date | None = None,
+        path: Path = historical_data_dir_path,
+) -> list[Stock]:
+    """Stocks with their stored histories in [start_date, end_date]; tickers without one are left out."""
+    stock_infos = list(stock_infos)
+    historical_data = load_historical_data(
+        tickers=[stock_info.ticker for stock_info in stock_infos],
+        start_date=start_date,
+        end_date=end_date,
+        path=path,
+    )
+    return [
+        Stock(info=stock_info, history=historical_data[stock_info.ticker])
+        for stock_info in stock_infos
+        if stock_info.ticker in historical_data
+    ]
+
+
+def _parse_category(value: str) -> StockCategory:
+    try:
+        return StockCategory(value)
+    except ValueError:
+        return StockCategory[value]
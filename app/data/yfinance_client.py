@@ -1,21 +1,145 @@
+from dataclasses import dataclass
 from datetime import date
+from typing import TYPE_CHECKING
 
-import yfinance as yf
+import numpy as np
+
+from app.core.profiling import count, traced
+from app.data.rate_limit import ProviderLimiter
+
+# yfinance (and the pandas it returns) are imported on first download: both are slow to import
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+@dataclass(frozen=True)
+class PriceHistory:
+    """Daily closes of one ticker: sorted datetime64[D] dates with aligned float64 closes."""
+    dates: np.ndarray
+    close: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.dates)
 
 
 class YfinanceClient:
-    def fetch_price_history(self, ticker: str) -> dict[date, float]:
-        ticker_obj = yf.Ticker(ticker)
-        hist = ticker_obj.history(period="max")
-        if hist.empty:
-            return {}
-        return {ts.date(): float(hist.loc[ts, 'Close']) for ts in hist.index}
+    MAX_CONCURRENT = 4
+    REQUESTS_PER_SECOND = 2.0  # unofficial API: stay well below what gets throttled
+    CHUNK_SIZE = 50  # tickers per bulk download
+
+    def __init__(self, limiter: ProviderLimiter | None = None, chunk_size: int = CHUNK_SIZE):
+        self.limiter = limiter or ProviderLimiter(self.MAX_CONCURRENT, self.REQUESTS_PER_SECOND)
+        self.chunk_size = chunk_size
+
+    @traced("yfinance.history")
+    def fetch_price_history(self, ticker: str, start: date | None = None) -> PriceHistory:
+        """Daily closes since IPO, or from `start` (inclusive) on."""
+        with self.limiter:
+            close = self._history_close(ticker, start)
+        if close.empty:
+            return _empty_history()
+        return PriceHistory(
+            dates=close.index.values.astype("datetime64[D]"),
+            close=close.to_numpy(dtype=np.float64),
+        )
+
+    def fetch_price_histories(self, tickers: list[str], start: date | None = None) -> dict[str, PriceHistory]:
+        """
+        Daily closes of many tickers through bulk downloads of `chunk_size` tickers each.
+
+        Tickers the download returned nothing for are left out, so callers can fall
+        back to `fetch_price_history` for them.
+        """
+        histories: dict[str, PriceHistory] = {}
+        for chunk in _chunks(tickers, self.chunk_size):
+            close = self._download_close(chunk, period="max" if start is None else None, start=start)
+            for ticker in chunk:
+                if ticker not in close:
+                    continue
+                column = close[ticker].dropna()
+                if not column.empty:
+                    histories[ticker] = PriceHistory(
+                        dates=column.index.values.astype("datetime64[D]"),
+                        close=column.to_numpy(dtype=np.float64),
+                    )
+        return histories
 
     def fetch_current_price(self, ticker: str) -> float | None:
+        return self.fetch_current_prices([ticker]).get(ticker)
+
+    def fetch_current_prices(self, tickers: list[str]) -> dict[str, float | None]:
+        """
+        Latest price of each ticker: the close of its most recent daily bar, which during
+        market hours is the last traded price. Read from bulk downloads rather than the
+        per-ticker `.info` quote summary.
+        """
+        prices: dict[str, float | None] = {ticker: None for ticker in tickers}
+        for chunk in _chunks(tickers, self.chunk_size):
+            close = self._download_close(chunk, period="5d")
+            for ticker in chunk:
+                if ticker in close:
+                    column = close[ticker].dropna()
+                    if not column.empty:
+                        prices[ticker] = float(column.iloc[-1])
+        return prices
+
+    @traced("yfinance.download")
+    def _download_close(
+            self,
+            tickers: list[str],
+            period: str | None = None,
+            start: date | None = None,
+    ) -> "pd.DataFrame":
+        """Close prices as a dates x tickers DataFrame."""
+        count("yfinance.download_tickers", len(tickers))
+        with self.limiter:
+            # yfinance requests each symbol of the batch on its own threads
+            self.limiter.charge(len(tickers) - 1)
+            return self._download_frame(tickers, period, start)
+
+    # =========================================================================
+    # Provider Calls (overridden by the record/replay clients in app.data.replay)
+    # =========================================================================
+
+    def _history_close(self, ticker: str, start: date | None) -> "pd.Series":
+        """One ticker's closes over a tz-naive date index."""
+        import pandas as pd
+        import yfinance as yf
+
         ticker_obj = yf.Ticker(ticker)
-        info = ticker_obj.info
-        for key in ('currentPrice', 'regularMarketPrice'):
-            value = info.get(key)
-            if isinstance(value, (int, float)):
-                return float(value)
-        return None
+        hist = ticker_obj.history(period="max") if start is None else ticker_obj.history(start=start)
+        if hist.empty:
+            return pd.Series(dtype=np.float64)
+        close = hist["Close"]
+        close.index = close.index.tz_localize(None)
+        return close
+
+    def _download_frame(self, tickers: list[str], period: str | None, start: date | None) -> "pd.DataFrame":
+        """Closes of a bulk download as a dates x tickers DataFrame over a tz-naive date index."""
+        import pandas as pd
+        import yfinance as yf
+
+        data = yf.download(
+            tickers,
+            period=period,
+            start=start,
+            auto_adjust=True,
+            actions=False,
+            threads=self.limiter.max_concurrent,
+            progress=False,
+            multi_level_index=True,
+        )
+        if data is None or data.empty:
+            return pd.DataFrame()
+        close = data["Close"]
+        if close.index.tz is not None:
+            close.index = close.index.tz_localize(None)
+        return close
+
+
+def _chunks(tickers: list[str], size: int) -> list[list[str]]:
+    return [tickers[i:i + size] for i in range(0, len(tickers), size)]
+
+
+def _empty_history() -> PriceHistory:
+    return PriceHistory(dates=np.empty(0, dtype="datetime64[D]"), close=np.empty(0))
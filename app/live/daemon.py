@@ -0,0 +1,228 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import asdict
+from datetime import date, datetime
+from pathlib import Path
+
+from app.core.analyzer import analyze_stock
+from app.core.models import Stock, StockAnalysis, StockInfo, StockQuarterlyData, StockHistoricalData
+from app.core.profiling import count, traced
+from app.data.eodhd_client import EODHDClient
+from app.data.historical_data_storage import load_historical_data
+from app.data.live_data_fetcher import LiveDataFetcher
+from app.data.universe import Universe
+from app.data.yfinance_client import YfinanceClient
+from app.live.live import error_analysis
+
+live_results_path = Path(__file__).parent.parent.parent.resolve() / "data" / "live" / "analyses.json"
+
+POLL_INTERVAL = 60.0  # seconds between price polls
+FUNDAMENTALS_INTERVAL = 6 * 3600.0  # seconds between fundamentals refreshes
+
+QuarterlyRecords = list[tuple[date, StockQuarterlyData]]
+# ticker -> (quarters, company name, None) or (None, None, error)
+FundamentalsFetch = dict[str, tuple[QuarterlyRecords | None, str | None, str | None]]
+
+
+class LiveDaemon:
+    """
+    Resident live screen that keeps histories, fundamentals and analyses in memory.
+
+    Each `poll` bulk-downloads current prices and re-analyzes only the tickers whose
+    price or fundamentals changed. Fundamentals are refetched every `fundamentals_interval`
+    seconds on a background thread, so prices keep updating while a refresh runs; a
+    finished refresh is applied by the next poll. On a new day the store is reloaded
+    (picking up the nightly ingestion) and every ticker is recomputed, since cycle windows
+    and filed quarters move with the date. The latest analyses are published as JSON to
+    `publish_path` whenever they change.
+
+    A failed poll leaves the last good prices and analyses in place and is retried on the
+    next interval.
+    """
+
+    def __init__(
+            self,
+            universe: Universe,
+            eodhd: EODHDClient | None = None,
+            yfinance: YfinanceClient | None = None,
+            publish_path: Path = live_results_path,
+            fundamentals_interval: float = FUNDAMENTALS_INTERVAL,
+            workers: int = 8,
+    ):
+        self.universe = universe
+        self.eodhd = eodhd or EODHDClient()
+        self.yfinance = yfinance or YfinanceClient()
+        self.publish_path = publish_path
+        self.fundamentals_interval = fundamentals_interval
+        self.workers = workers
+
+        self.day: date | None = None
+        self.historical_data: dict[str, StockHistoricalData] = {}
+        self.analyses: dict[str, StockAnalysis] = {}
+        self._prices: dict[str, float] = {}
+        self._records: dict[str, QuarterlyRecords] = {}
+        self._names: dict[str, str] = {}
+        self._errors: dict[str, str] = {}
+        self._stale: set[str] = set()  # tickers whose inputs changed since they were last analyzed
+        self._fundamentals_started: float | None = None
+        self._fundamentals_future: Future[FundamentalsFetch] | None = None
+
+    def run(self, interval: float = POLL_INTERVAL, polls: int | None = None) -> None:
+        """Poll every `interval` seconds, `polls` times (forever if None)."""
+        done = 0
+        while polls is None or done < polls:
+            start = time.monotonic()
+            try:
+                recomputed = self.poll()
+            except Exception as e:
+                # Transient provider or store failures must not stop the daemon
+                print(f"{datetime.now():%H:%M:%S} poll failed, retrying next interval: {e!r}")
+            else:
+                print(
+                    f"{datetime.now():%H:%M:%S} recomputed {len(recomputed)}/{len(self.universe)} tickers "
+                    f"in {time.monotonic() - start:.2f}s"
+                )
+            done += 1
+            if polls is None or done < polls:
+                time.sleep(max(0.0, interval - (time.monotonic() - start)))
+
+    @traced("LiveDaemon.poll")
+    def poll(self) -> list[str]:
+        """
+        Bring every analysis up to date and return the tickers that were recomputed.
+
+        State only changes once each step has succeeded, so a poll that raises can simply be
+        retried: changes it did pick up stay marked stale until they are analyzed.
+        """
+        today = date.today()
+        if today != self.day:
+            historical_data = load_historical_data(tickers=self.universe.tickers, summary_only=True)
+            self.day, self.historical_data = today, historical_data
+            self.analyses.clear()
+
+        self._update_fundamentals()
+
+        # A failed quote keeps the last known price
+        for ticker, price in self.yfinance.fetch_current_prices(self.universe.tickers).items():
+            if price is not None and price != self._prices.get(ticker):
+                self._prices[ticker] = price
+                self._stale.add(ticker)
+
+        recomputed = [
+            stock_info.ticker for stock_info in self.universe
+            if stock_info.ticker in self._stale or stock_info.ticker not in self.analyses
+        ]
+        for ticker in recomputed:
+            self.analyses[ticker] = self._analyze(self.universe.get(ticker))
+            self._stale.discard(ticker)
+        count("live.recomputed", len(recomputed))
+        if recomputed:
+            self.publish()
+        return recomputed
+
+    def publish(self) -> None:
+        """Atomically replace the published file with the current analyses, in universe order."""
+        document = {
+            "updated": datetime.now().isoformat(timespec="seconds"),
+            "analyses": [
+                _analysis_record(self.analyses[ticker])
+                for ticker in self.universe.tickers
+                if ticker in self.analyses
+            ],
+        }
+        self.publish_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.publish_path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(document, indent=2), encoding="utf-8")
+        os.replace(temp_path, self.publish_path)
+
+    def _update_fundamentals(self) -> None:
+        """Start a background refresh when one is due, and apply the one that has finished."""
+        now = time.monotonic()
+        due = self._fundamentals_started is None or now - self._fundamentals_started >= self.fundamentals_interval
+        if due and self._fundamentals_future is None:
+            self._fundamentals_started = now
+            self._fundamentals_future = self._start_refresh(set(self._names))
+
+        future = self._fundamentals_future
+        if future is None:
+            return
+        if not self._records and not self._errors:
+            wait([future])  # nothing to analyze against until the first refresh lands
+        if future.done():
+            self._fundamentals_future = None
+            try:
+                self._apply_fundamentals(future.result())
+            except Exception as e:
+                print(f"{datetime.now():%H:%M:%S} fundamentals refresh failed, retrying next poll: {e!r}")
+                self._fundamentals_started = None
+
+    def _start_refresh(self, named: set[str]) -> Future[FundamentalsFetch]:
+        """Fetch fundamentals on a daemon thread, so stopping the daemon never waits for a refresh."""
+        future: Future[FundamentalsFetch] = Future()
+
+        def refresh() -> None:
+            try:
+                future.set_result(self._fetch_fundamentals(named))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=refresh, name="fundamentals-refresh", daemon=True).start()
+        return future
+
+    def _fetch_fundamentals(self, named: set[str]) -> FundamentalsFetch:
+        """Refetch every ticker's fundamentals (runs on the background thread, touching no daemon state)."""
+        fetcher = LiveDataFetcher(self.eodhd, self.yfinance)  # fresh cache
+
+        def fetch(ticker: str) -> tuple[QuarterlyRecords | None, str | None, str | None]:
+            try:
+                records = fetcher.fetch_quarterly_records(ticker)
+                name = None if ticker in named else fetcher.fetch_company_name(ticker)
+                return records, name, None
+            except Exception as e:
+                return None, None, str(e)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fundamentals") as executor:
+            return dict(zip(self.universe.tickers, executor.map(fetch, self.universe.tickers)))
+
+    def _apply_fundamentals(self, fetched: FundamentalsFetch) -> None:
+        """Take over a refresh, marking the tickers whose quarters (or first error) changed as stale."""
+        for ticker, (records, name, error) in fetched.items():
+            if name is not None:
+                self._names.setdefault(ticker, name)
+            if records is None:
+                # Keep serving the last good fundamentals, if any
+                if ticker not in self._records and self._errors.get(ticker) != error:
+                    self._errors[ticker] = error
+                    self._stale.add(ticker)
+                continue
+            self._errors.pop(ticker, None)
+            if records != self._records.get(ticker):
+                self._records[ticker] = records
+                self._stale.add(ticker)
+
+    def _analyze(self, stock_info: StockInfo) -> StockAnalysis:
+        ticker = stock_info.ticker
+        history = self.historical_data.get(ticker)
+        name = (history.name if history is not None else None) or self._names.get(ticker)
+        stock_info = StockInfo(ticker=ticker, category=stock_info.category, name=name)
+        if history is None:
+            return error_analysis(stock_info, f"No historical data for {ticker}. Run save_historical_data.py first.")
+        if ticker not in self._records:
+            return error_analysis(stock_info, self._errors.get(ticker, "No fundamentals"))
+
+        live = LiveDataFetcher.live_data(self._prices.get(ticker), self._records[ticker])
+        return analyze_stock(Stock(info=stock_info, history=history, live=live))
+
+
+def _analysis_record(analysis: StockAnalysis) -> dict:
+    return {
+        "ticker": analysis.info.ticker,
+        "name": analysis.info.name,
+        "category": analysis.info.category.value,
+        "metrics": asdict(analysis.metrics),
+        "signals": asdict(analysis.signals) | {"signal_count": analysis.signals.signal_count},
+        "error": analysis.error,
+    }
@@ -1,11 +1,20 @@
-from app.core.models import StockInfo, Stock, StockHistoricalData
+from app.core.models import StockInfo, Stock, StockHistoricalData, StockAnalysis, StockMetrics, StockSignals
 from app.data.live_data_fetcher import LiveDataFetcher
 
 
-def fetch_stock(stock_info: StockInfo, historical_data: dict[str, StockHistoricalData]) -> Stock:
-    live_fetcher = LiveDataFetcher()
+def fetch_stock(
+        stock_info: StockInfo,
+        historical_data: dict[str, StockHistoricalData],
+        live_fetcher: LiveDataFetcher | None = None,
+) -> Stock:
+    """Pass the run's shared `live_fetcher`; a fresh one is only for one-off calls."""
+    live_fetcher = live_fetcher or LiveDataFetcher()
 
-    company_name = live_fetcher.fetch_company_name(stock_info.ticker)
+    history_data = historical_data.get(stock_info.ticker)
+    if history_data is None:
+        raise ValueError(f"No historical data for {stock_info.ticker}. Run save_historical_data.py first.")
+
+    company_name = history_data.name or live_fetcher.fetch_company_name(stock_info.ticker)
     stock_info_with_name = StockInfo(
         ticker=stock_info.ticker,
         category=stock_info.category,
@@ -14,12 +23,18 @@ def fetch_stock(stock_info: StockInfo, historical_data: dict[str, StockHistorica
 
     live_data = live_fetcher.fetch(stock_info.ticker)
 
-    history_data = historical_data.get(stock_info.ticker)
-    if history_data is None:
-        raise ValueError(f"No historical data for {stock_info.ticker}. Run save_historical_data.py first.")
-
     return Stock(
         info=stock_info_with_name,
         live=live_data,
         history=history_data,
     )
+
+
+def error_analysis(stock_info: StockInfo, error: str) -> StockAnalysis:
+    """Placeholder analysis for a ticker that could not be fetched."""
+    return StockAnalysis(
+        info=stock_info,
+        metrics=StockMetrics(),
+        signals=StockSignals(),
+        error=error,
+    )
@@ -0,0 +1,49 @@
+import asyncio
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.analyzer import analyze_stock
+from app.core.models import StockInfo, StockHistoricalData, StockAnalysis
+from app.data.live_data_fetcher import LiveDataFetcher
+from app.live.live import fetch_stock, error_analysis
+
+MAX_CONCURRENT = 8  # tickers fetched at once; the clients' limiters still cap each provider
+TICKER_TIMEOUT = 60.0  # seconds allowed for one ticker's live data
+
+
+async def screen_stocks(
+        stock_infos: list[StockInfo],
+        historical_data: dict[str, StockHistoricalData],
+        live_fetcher: LiveDataFetcher,
+        max_concurrent: int = MAX_CONCURRENT,
+        timeout: float = TICKER_TIMEOUT,
+) -> AsyncIterator[StockAnalysis]:
+    """
+    Fetch and analyze every stock concurrently, yielding analyses in completion order.
+
+    Fetches run on a pool of `max_concurrent` threads. A ticker whose fetch takes longer
+    than `timeout` seconds (or fails) yields an error analysis at once; its thread keeps
+    its slot until the fetch returns, so the timeout of a later ticker only counts time
+    spent actually fetching it.
+    """
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(max_concurrent)
+    executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="screen")
+
+    async def screen(stock_info: StockInfo) -> StockAnalysis:
+        await slots.acquire()
+        fetch = loop.run_in_executor(executor, fetch_stock, stock_info, historical_data, live_fetcher)
+        fetch.add_done_callback(lambda _: slots.release())
+        try:
+            stock = await asyncio.wait_for(asyncio.shield(fetch), timeout)
+        except TimeoutError:
+            return error_analysis(stock_info, f"Timed out after {timeout:g}s")
+        except Exception as e:
+            return error_analysis(stock_info, str(e))
+        return analyze_stock(stock)
+
+    try:
+        for analysis in asyncio.as_completed([screen(stock_info) for stock_info in stock_infos]):
+            yield await analysis
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
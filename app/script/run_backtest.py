@@ -1,51 +1,74 @@
+import os
+from collections.abc import Iterator
 from datetime import date, timedelta
 
-from app.backtest.analyzer import analyze_backtest
 from app.backtest.engine import BacktestEngine
 from app.backtest.report import print_backtest_report, plot_equity_curve
+from app.backtest.results import BacktestResults, save_backtest_results
+from app.backtest.signal_cache import SignalCache
 from app.core.models import Stock
-from app.data.historical_data_storage import load_historical_data
-from app.data.watchlist import WATCHLIST
+from app.data.universe import SHARD_SIZE, load_stocks, load_universe
 
 
-def main():
-    historical_data = load_historical_data()
-
-    # Build Stock objects for backtest
-    stocks: list[Stock] = []
-    for stock_info in WATCHLIST:
-        history = historical_data.get(stock_info.ticker)
-        if history is None:
-            print(f"  Skipping {stock_info.ticker}: no historical data")
-            continue
-        stocks.append(
-            Stock(
-                info=stock_info,
-                history=history
-            )
-        )
-
-    print(f"Loaded {len(stocks)} stocks for backtest")
-
+def main(
+        workers: int = os.cpu_count() or 1,
+        shard_size: int = SHARD_SIZE,
+        plot: bool = True,
+        cache: bool = True,
+):
     # Backtest period: last 5 years
     end_date = date.today()
     start_date = end_date - timedelta(days=5 * 365)
 
+    universe = load_universe()
+    skipped: set[str] = set()
+
+    def load_shards() -> Iterator[list[Stock]]:
+        # The 5-year EV/EBIT cycle looks back another 5 years from the first backtest day
+        for shard in universe.shards(shard_size):
+            stocks = load_stocks(shard, start_date=start_date - timedelta(days=5 * 365), end_date=end_date)
+            loaded = {stock.info.ticker for stock in stocks}
+            for ticker in shard.tickers:
+                if ticker not in loaded and ticker not in skipped:
+                    skipped.add(ticker)
+                    print(f"  Skipping {ticker}: no historical data")
+            yield stocks
+
     print(f"Backtest period: {start_date} to {end_date}")
-    print("Running backtest...")
+    print(f"Precomputing {len(universe)} stocks in shards of {shard_size}...")
+
+    # Histories are loaded one shard at a time; only signals and prices are kept.
+    # Signal cells of earlier runs over the same history come from the on-disk cache.
+    signal_cache = SignalCache() if cache else None
+    engine = BacktestEngine.from_shards(
+        load_shards, start_date, end_date, verbose=True, workers=workers, signal_cache=signal_cache,
+    )
+    print(f"Loaded {len(engine.tickers)} stocks for backtest")
+    if signal_cache is not None:
+        print(f"Signal cache: {signal_cache.hits} cells reused, {signal_cache.misses} computed")
 
-    engine = BacktestEngine(stocks, start_date, end_date, verbose=True)
+    print("Running backtest...")
     strategy_snapshots, benchmark_snapshots = engine.run()
 
     print(f"Backtest complete: {len(strategy_snapshots)} trading days")
 
     # Analyze results
-    strategy_metrics = analyze_backtest(strategy_snapshots)
-    benchmark_metrics = analyze_backtest(benchmark_snapshots)
+    strategy_metrics, benchmark_metrics = engine.analyze()
+
+    # Saved for `python -m app report`
+    save_backtest_results(BacktestResults(
+        start_date=start_date,
+        end_date=end_date,
+        strategy_metrics=strategy_metrics,
+        benchmark_metrics=benchmark_metrics,
+        strategy_snapshots=list(strategy_snapshots),
+        benchmark_snapshots=list(benchmark_snapshots),
+    ))
 
     # Print report and plot
     print_backtest_report(strategy_metrics, benchmark_metrics)
-    plot_equity_curve(strategy_snapshots, benchmark_snapshots)
+    if plot:
+        plot_equity_curve(strategy_snapshots, benchmark_snapshots)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,36 @@
+import time
+from datetime import timedelta
+
+from app.benchmark.differential import run_differential
+from app.benchmark.report import print_benchmark_report, print_differential_report
+from app.benchmark.suite import run_benchmarks
+from app.benchmark.synthetic import DEFAULT_END_DATE, generate_universe
+
+
+def main(
+        scales: tuple[int, ...] = (70, 1000, 5000),
+        years: int = 10,
+        memory: bool = True,
+        differential: bool = True,
+        workers: int = 1,
+):
+    # Backtest period: last 5 years, leaving 5 years of history for the EV/EBIT cycle
+    end_date = DEFAULT_END_DATE
+    start_date = end_date - timedelta(days=5 * 365)
+
+    for scale in scales:
+        print(f"Generating {scale} synthetic tickers x {years} years...")
+        start = time.perf_counter()
+        stocks = generate_universe(scale, years=years)
+        print(f"  Generated in {time.perf_counter() - start:.1f}s")
+
+        if differential and scale == scales[0]:
+            print("Checking optimized paths against the reference implementations...")
+            print_differential_report(run_differential(stocks, start_date, end_date, workers=workers))
+
+        print(f"Benchmarking {scale} tickers...")
+        print_benchmark_report(run_benchmarks(stocks, start_date, end_date, memory=memory, workers=workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,84 @@
+from datetime import date, timedelta
+
 from app.core.analyzer import analyze_stock
-from app.core.models import StockAnalysis, StockMetrics, StockSignals
+from app.core.models import Stock, StockAnalysis, StockHistoricalData
+from app.core.parallel import map_stocks
+from app.core.profiling import phase
+from app.data.eodhd_client import EODHDClient
 from app.data.historical_data_storage import load_historical_data
-from app.data.watchlist import WATCHLIST
-from app.live.live import fetch_stock
+from app.data.live_data_fetcher import LiveDataFetcher
+from app.data.universe import SHARD_SIZE, Universe, load_universe
+from app.data.yfinance_client import YfinanceClient
+from app.live.live import fetch_stock, error_analysis
 from app.live.report import print_stock_analysis, print_summary_report
 
 
-def main():
-    historical_data = load_historical_data()
+def main(workers: int = 1, shard_size: int = SHARD_SIZE):
+    universe = load_universe()
+    # Clients (connection pools and rate limits) are shared by every shard
+    eodhd, yfinance = EODHDClient(), YfinanceClient()
+
+    # Shards are fetched and analyzed one after another; only their analyses are kept
     analyses: list[StockAnalysis] = []
+    for shard in universe.shards(shard_size):
+        with phase("live.shard"):
+            # Live analysis only needs the stored cycle summaries (or, without one, the 5-year EV/EBIT cycle)
+            historical_data = load_historical_data(
+                tickers=shard.tickers,
+                start_date=date.today() - timedelta(days=5 * 365),
+                summary_only=True,
+            )
+
+            # The fundamentals cache only lives as long as its shard
+            live_fetcher = LiveDataFetcher(eodhd, yfinance)
+            live_fetcher.prefetch_prices(shard.tickers)
+
+            if workers > 1:
+                for analysis in _fetch_then_analyze(shard, historical_data, live_fetcher, workers):
+                    analyses.append(analysis)
+                    print(f"\n[{len(analyses)}/{len(universe)}]")
+                    print_stock_analysis(analysis)
+                continue
+
+            for stock_info in shard:
+                print(f"\n[{len(analyses) + 1}/{len(universe)}]")
+                try:
+                    stock = fetch_stock(stock_info, historical_data, live_fetcher)
+                    analysis = analyze_stock(stock)
+                    analyses.append(analysis)
+                    print_stock_analysis(analysis)
+                except Exception as e:
+                    print(f"  ERROR: {e}")
+                    analyses.append(error_analysis(stock_info, str(e)))
 
-    for i, stock_info in enumerate(WATCHLIST, 1):
-        print(f"\n[{i}/{len(WATCHLIST)}]")
+    print_summary_report(analyses)
+
+
+def _fetch_then_analyze(
+        shard: Universe,
+        historical_data: dict[str, StockHistoricalData],
+        live_fetcher: LiveDataFetcher,
+        workers: int,
+) -> list[StockAnalysis]:
+    """Fetch live data for every ticker of the shard, then analyze all of them across `workers` processes."""
+    stocks: list[Stock] = []
+    fetch_errors: dict[str, StockAnalysis] = {}
+    for i, stock_info in enumerate(shard, 1):
+        print(f"[{i}/{len(shard)}] Fetching {stock_info.ticker}...")
         try:
-            stock = fetch_stock(stock_info, historical_data)
-            analysis = analyze_stock(stock)
-            analyses.append(analysis)
-            print_stock_analysis(analysis)
+            stocks.append(fetch_stock(stock_info, historical_data, live_fetcher))
         except Exception as e:
             print(f"  ERROR: {e}")
-            analyses.append(StockAnalysis(
-                info=stock_info,
-                metrics=StockMetrics(),
-                signals=StockSignals(),
-                error=str(e),
-            ))
+            fetch_errors[stock_info.ticker] = error_analysis(stock_info, str(e))
 
-    print_summary_report(analyses)
+    analyzed = {
+        analysis.info.ticker: analysis
+        for analysis in map_stocks(analyze_stock, stocks, workers=workers)
+    }
+    return [
+        analyzed.get(stock_info.ticker) or fetch_errors[stock_info.ticker]
+        for stock_info in shard
+    ]
 
 
 if __name__ == "__main__":
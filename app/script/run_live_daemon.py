@@ -0,0 +1,15 @@
+from app.data.universe import load_universe
+from app.live.daemon import FUNDAMENTALS_INTERVAL, POLL_INTERVAL, LiveDaemon, live_results_path
+
+
+def main(interval: float = POLL_INTERVAL, fundamentals_interval: float = FUNDAMENTALS_INTERVAL, workers: int = 8):
+    daemon = LiveDaemon(load_universe(), fundamentals_interval=fundamentals_interval, workers=workers)
+    print(f"Screening {len(daemon.universe)} tickers every {interval:g}s, publishing to {live_results_path}")
+    try:
+        daemon.run(interval)
+    except KeyboardInterrupt:
+        print("Stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import asyncio
+import time
+from datetime import date, timedelta
+
+from app.core.models import StockAnalysis
+from app.data.eodhd_client import EODHDClient
+from app.data.historical_data_storage import load_historical_data
+from app.data.live_data_fetcher import LiveDataFetcher
+from app.data.universe import SHARD_SIZE, load_universe
+from app.data.yfinance_client import YfinanceClient
+from app.live.report import print_stock_analysis, print_summary_report
+from app.live.screener import MAX_CONCURRENT, TICKER_TIMEOUT, screen_stocks
+
+
+def main(max_concurrent: int = MAX_CONCURRENT, timeout: float = TICKER_TIMEOUT, shard_size: int = SHARD_SIZE):
+    asyncio.run(_screen(max_concurrent, timeout, shard_size))
+
+
+async def _screen(max_concurrent: int, timeout: float, shard_size: int) -> None:
+    start = time.perf_counter()
+    universe = load_universe()
+    eodhd, yfinance = EODHDClient(), YfinanceClient()
+
+    analyses: dict[str, StockAnalysis] = {}
+    for shard in universe.shards(shard_size):
+        historical_data = load_historical_data(
+            tickers=shard.tickers,
+            start_date=date.today() - timedelta(days=5 * 365),
+            summary_only=True,
+        )
+
+        live_fetcher = LiveDataFetcher(eodhd, yfinance)
+        await asyncio.to_thread(live_fetcher.prefetch_prices, shard.tickers)
+
+        async for analysis in screen_stocks(shard.stocks, historical_data, live_fetcher, max_concurrent, timeout):
+            analyses[analysis.info.ticker] = analysis
+            print(f"\n[{len(analyses)}/{len(universe)}]")
+            print_stock_analysis(analysis)
+
+    # The summary lists tickers in universe order, whatever order they finished in
+    print_summary_report([analyses[ticker] for ticker in universe.tickers])
+    print(f"Screened in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+from app.benchmark.providers import run_provider_benchmarks
+from app.benchmark.report import print_provider_report
+from app.data.replay import FaultProfile, ProviderArchive, replay_dir_path
+from app.data.universe import load_universe
+
+
+def main(
+        workers: tuple[int, ...] = (1, 4, 8, 16),
+        latency: float = 0.2,
+        jitter: float = 0.2,
+        error_rate: float = 0.05,
+        rate_limit: float | None = 20.0,
+        seed: int = 0,
+):
+    """Benchmark the data layer offline against responses recorded by `save_historical_data.main(record=True)`."""
+    tickers = load_universe().tickers
+    faults = FaultProfile(latency=latency, jitter=jitter, error_rate=error_rate, rate_limit=rate_limit, seed=seed)
+
+    print(f"Replaying {len(tickers)} tickers from {replay_dir_path} with {faults}...")
+    results = run_provider_benchmarks(tickers, ProviderArchive(), workers, eodhd_faults=faults, yfinance_faults=faults)
+    print_provider_report(results)
+
+
+if __name__ == "__main__":
+    main()
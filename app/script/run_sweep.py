@@ -0,0 +1,45 @@
+import os
+from datetime import date, timedelta
+
+from app.backtest.models import SIGNAL_NAMES
+from app.backtest.report import print_sweep_report
+from app.backtest.sweep import ParameterSweep, make_grid
+from app.data.universe import load_stocks, load_universe
+
+
+def main(workers: int = os.cpu_count() or 1):
+    configs = make_grid(
+        ev_ebit_percentiles=[10, 20, 25, 30, 40],
+        ev_ebit_long_years=[3, 5, 7],
+        ev_ebit_short_years=[1, 2],
+        signal_rules=[(SIGNAL_NAMES, None), (SIGNAL_NAMES, 3)],
+    )
+
+    # Backtest period: last 5 years
+    end_date = date.today()
+    start_date = end_date - timedelta(days=5 * 365)
+
+    # The longest EV/EBIT cycle looks back that many years from the first backtest day
+    lookback_years = max(config.ev_ebit_long_years for config in configs)
+    universe = load_universe()
+    stocks = load_stocks(
+        universe,
+        start_date=start_date - timedelta(days=lookback_years * 365),
+        end_date=end_date,
+    )
+    loaded = {stock.info.ticker for stock in stocks}
+    for ticker in universe.tickers:
+        if ticker not in loaded:
+            print(f"  Skipping {ticker}: no historical data")
+
+    print(f"Loaded {len(stocks)} stocks, sweeping {len(configs)} configs")
+    print(f"Backtest period: {start_date} to {end_date}")
+
+    sweep = ParameterSweep(stocks, start_date, end_date, configs, verbose=True, workers=workers)
+    results, benchmark_metrics = sweep.run_sweep()
+
+    print_sweep_report(results, benchmark_metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,63 @@
-from app.core.models import StockHistoricalData
+from app.core.profiling import phase
 from app.data.historical_data_fetcher import HistoryDataFetcher
-from app.data.historical_data_storage import save_historical_data
-from app.data.watchlist import WATCHLIST
-
-
-def main():
-    fetcher = HistoryDataFetcher()
-    data: dict[str, StockHistoricalData] = {}
-
-    for i, stock_info in enumerate(WATCHLIST, 1):
-        ticker = stock_info.ticker
-        print(f"[{i}/{len(WATCHLIST)}] Fetching {ticker}...")
-        try:
-            history = fetcher.fetch(ticker)
-            data[ticker] = history
-            print(f"  daily: {len(history.daily)}, quarterly: {len(history.quarterly)}")
-        except Exception as e:
-            print(f"  ERROR: {e}")
-
-    save_historical_data(data)
-    print(f"\nSaved {len(data)} tickers to historical_data.pkl")
+from app.data.historical_data_storage import historical_data_dir_path, load_historical_data, HistoryStoreWriter
+from app.data.ingestion import ingest_histories
+from app.data.universe import SHARD_SIZE, load_universe
+
+
+def main(incremental: bool = True, workers: int = 8, record: bool = False, shard_size: int = SHARD_SIZE):
+    """
+    With `record`, provider responses are also archived for replay (see run_replay_benchmark).
+    Recording always fetches whole histories: the replay benchmark runs a full ingestion, and
+    a refresh would only archive the few bars after each stored ticker's anchor.
+    """
+    if record and incremental:
+        print("Recording: fetching whole histories instead of refreshing")
+        incremental = False
+    universe = load_universe()
+    tickers = universe.tickers
+
+    if record:
+        from app.data.replay import ProviderArchive, recording_clients  # pandas is only needed to record
+
+        fetcher = HistoryDataFetcher(*recording_clients(ProviderArchive()))
+    else:
+        fetcher = HistoryDataFetcher()
+    failed: list[str] = []
+    done = 0
+    with HistoryStoreWriter() as writer:
+        # One shard's histories in memory at a time
+        for shard in universe.shards(shard_size):
+            with phase("ingest.shard"):
+                # Incremental: only bars newer than the stored ones. In-memory copies, since each
+                # ticker's segment is rewritten while the run goes on.
+                stored = load_historical_data(tickers=shard.tickers, mmap=False) if incremental else {}
+
+                for result in ingest_histories(fetcher, shard.tickers, stored, workers=workers):
+                    done += 1
+                    prefix = f"[{done}/{len(tickers)}] {result.ticker} ({result.seconds:.1f}s)"
+                    if result.history is None:
+                        print(f"{prefix} ERROR: {result.error}")
+                        failed.append(result.ticker)
+                        continue
+
+                    # Persisted one ticker at a time (on this thread only), so a failure loses nothing else
+                    writer.save(result.ticker, result.history)
+                    print(
+                        f"{prefix} daily: {len(result.history.daily)} ({result.added_days:+d}), "
+                        f"quarterly: {len(result.history.quarterly)}"
+                    )
+
+    print(f"\nSaved {len(tickers) - len(failed)} tickers to {historical_data_dir_path}")
+    if record:
+        print("Recorded provider responses for replay")
+    if failed:
+        print(f"Failed ({len(failed)}): {', '.join(failed)}")
+    for endpoint, stats in fetcher.eodhd.stats.items():
+        print(
+            f"EODHD {endpoint}: {stats.requests} requests, {stats.retries} retries, {stats.failures} failed, "
+            f"mean {stats.mean_seconds:.2f}s, max {stats.max_seconds:.2f}s, {stats.total_bytes / 2 ** 20:.1f} MiB"
+        )
 
 
 if __name__ == "__main__":